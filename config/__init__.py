@@ -3,11 +3,13 @@
 from .settings import (
     # Paths
     PROJECT_ROOT,
+    REPO_ROOT,
     INPUT_ROOT,
     OUTPUT_ROOT,
     FOOD_INPUT_DIR,
     HPC_INPUT_DIR,
     MOVE_INPUT_TO_PROCESSED,
+    WRITE_IMAGES_TO_DISK,
     
     # File limits
     MAX_FILE_SIZE_MB,
@@ -18,8 +20,14 @@ from .settings import (
     
     # LLM limits
     MAX_TEXT_CHARS_BEFORE_LLM,
-    JSON_RETRY_ATTEMPTS,
     CHUNK_SIZE,
+    CHUNK_TARGET_CHARS,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_DIR,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_ENTRIES,
     
     # LLM settings
     DEFAULT_MODEL,
@@ -29,11 +37,13 @@ from .settings import (
 __all__ = [
     # Paths
     "PROJECT_ROOT",
+    "REPO_ROOT",
     "INPUT_ROOT",
     "OUTPUT_ROOT",
     "FOOD_INPUT_DIR",
     "HPC_INPUT_DIR",
     "MOVE_INPUT_TO_PROCESSED",
+    "WRITE_IMAGES_TO_DISK",
     
     # File limits
     "MAX_FILE_SIZE_MB",
@@ -44,8 +54,14 @@ __all__ = [
     
     # LLM limits
     "MAX_TEXT_CHARS_BEFORE_LLM",
-    "JSON_RETRY_ATTEMPTS",
     "CHUNK_SIZE",
+    "CHUNK_TARGET_CHARS",
+    "LLM_MAX_CONCURRENCY",
+    "LLM_MAX_RETRIES",
+    "LLM_CACHE_ENABLED",
+    "LLM_CACHE_DIR",
+    "LLM_CACHE_TTL_SECONDS",
+    "LLM_CACHE_MAX_ENTRIES",
     
     # LLM settings
     "DEFAULT_MODEL",
@@ -4,7 +4,10 @@ Central configuration for repository paths and safety limits.
 This module defines:
 - Repository-relative input/output directories used by the pipeline and UI.
 - File and sheet limits to prevent memory issues and oversized spreadsheets.
-- LLM-related limits (text size, retry count, chunk size) to avoid context/window failures.
+- LLM-related limits (text size, retry count, chunk size, concurrency) to avoid context/window
+  failures and rate limiting.
+- The on-disk LLM response cache used to skip re-extracting unchanged chunks (location,
+  entry lifetime and size cap).
 - Default LLM model settings.
 
 All values are constants and should be imported where needed (no runtime logic here).
@@ -12,10 +15,12 @@ All values are constants and should be imported where needed (no runtime logic h
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REPO_ROOT = Path(__file__).resolve().parents[1]
 
 INPUT_ROOT = PROJECT_ROOT / "input_offers"
 OUTPUT_ROOT = PROJECT_ROOT / "offer_outputs"
@@ -25,6 +30,9 @@ HPC_INPUT_DIR = INPUT_ROOT / "hpc"
 
 MOVE_INPUT_TO_PROCESSED = False
 
+# Debug aid: write uploaded product images to the temp dir instead of passing them in memory.
+WRITE_IMAGES_TO_DISK = False
+
 MAX_FILE_SIZE_MB = 50
 
 MAX_SHEET_ROWS = 10_000
@@ -33,8 +41,18 @@ MAX_SHEETS = 20
 EXTREME_COLS_LIMIT = 500
 
 MAX_TEXT_CHARS_BEFORE_LLM = 120_000
-JSON_RETRY_ATTEMPTS = 3
 CHUNK_SIZE = 50
+CHUNK_TARGET_CHARS = 30_000
+
+LLM_MAX_CONCURRENCY = 8
+LLM_MAX_RETRIES = 3
+
+# Off by default: cache entries hold extracted supplier data. Enable with LLM_CACHE_ENABLED=1
+# and point LLM_CACHE_DIR at a managed location (e.g. a shared volume in deployment).
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "0").strip().lower() in ("1", "true", "yes")
+LLM_CACHE_DIR = Path(os.environ.get("LLM_CACHE_DIR", REPO_ROOT / ".llm_cache"))
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 2_000
 
 DEFAULT_MODEL = "gpt-4o-mini"
 DEFAULT_TEMPERATURE = 0
@@ -3,4 +3,7 @@
 from .food import FOOD_HEADERS
 from .hpc import HPC_HEADERS
 
-__all__ = ["FOOD_HEADERS", "HPC_HEADERS"]
\ No newline at end of file
+# Output headers per department ("food" / "hpc")
+HEADERS_BY_DEPT = {"food": FOOD_HEADERS, "hpc": HPC_HEADERS}
+
+__all__ = ["FOOD_HEADERS", "HPC_HEADERS", "HEADERS_BY_DEPT"]
\ No newline at end of file
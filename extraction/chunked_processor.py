@@ -6,164 +6,208 @@ sending each chunk to the LLM for structured extraction, and merging the results
 
 Key features:
 - Sanitizes Excel/pandas-native types into JSON-safe values.
+- Serializes rows to compact JSON with orjson (no pretty-printing: fewer tokens sent).
+- Packs rows greedily into chunks by serialized size (capped in rows, which bounds output
+  length), so wide sheets never overflow the context and narrow ones are not over-split.
 - Enforces a maximum serialized text size before any LLM call.
-- Robustly extracts/parses JSON from model output (handles markdown/code fences).
-- Retries JSON parsing and can ask the model to repair invalid JSON.
+- Dispatches chunks to the LLM concurrently (bounded thread pool, order preserved).
+- Fails fast: when one chunk fails, chunks that have not started yet are cancelled.
+- Caches responses on disk keyed by a hash of model, prompts and chunk content, so reruns
+  on unchanged data skip the API entirely. Entries expire after LLM_CACHE_TTL_SECONDS and
+  each model's cache is capped at LLM_CACHE_MAX_ENTRIES files (oldest evicted first).
+- Requests strict structured outputs (JSON schema derived from CanonicalRow), so every
+  response is valid JSON and no parse-retry / JSON-repair round-trips are needed.
 """
 
 from __future__ import annotations
 
-import json
-import re
-import sys
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from operator import methodcaller
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Tuple
 
+import orjson
 import pandas as pd
 
+from config import (
+    CHUNK_SIZE,
+    CHUNK_TARGET_CHARS,
+    LLM_CACHE_DIR,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_MAX_CONCURRENCY,
+    MAX_TEXT_CHARS_BEFORE_LLM,
+)
+
 from .llm_client import get_client
 from .prompts import EXTRACTION_SYSTEM_PROMPT, build_extraction_prompt
+from .schema import PRODUCTS_RESPONSE_FORMAT
 
-sys.path.append(str(Path(__file__).parent.parent))
-from config import CHUNK_SIZE, MAX_TEXT_CHARS_BEFORE_LLM, JSON_RETRY_ATTEMPTS  # noqa: E402
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+_SCHEMA_BYTES = orjson.dumps(PRODUCTS_RESPONSE_FORMAT, option=orjson.OPT_SORT_KEYS)
 
 
-def _sanitize_for_json(obj: Any) -> Any:
-    """Convert non-JSON-serializable values (datetime, pandas NA/NaT) into JSON-safe types."""
-    from datetime import date, datetime
+def _sanitize_rows(rows: List[Dict]) -> List[Dict[str, Any]]:
+    """Replace NaN/NA/NaT with None column-wise instead of recursing through every cell.
 
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    if isinstance(obj, dict):
-        return {k: _sanitize_for_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_sanitize_for_json(item) for item in obj]
-    if pd.isna(obj):
-        return None
-    return obj
+    The frame keeps object dtype so supplier values retain their Python types (no int -> float
+    upcasting of EAN codes); datetimes are left for orjson to serialize as ISO strings.
+    """
+    df = pd.DataFrame(rows, dtype=object)
+    df = df.where(df.notna(), None)
+    return df.to_dict(orient="records")
 
 
-def _extract_json_from_text(text: str) -> str:
-    """Extract the first JSON object from a response that may include markdown or extra text."""
-    text = (text or "").strip()
+# Exact-type dispatch for the values orjson hands back to `_json_default`; anything not
+# listed (Decimal, timedelta, ...) is stringified.
+_isoformat = methodcaller("isoformat")
 
-    if "```" in text:
-        match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, flags=re.DOTALL)
-        if match:
-            return match.group(1)
-        text = re.sub(r"```(?:json)?", "", text).strip()
+_JSON_DEFAULTS: Dict[type, Callable[[Any], Any]] = {
+    pd.Timestamp: pd.Timestamp.isoformat,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
 
-    match = re.search(r"\{.*\}", text, flags=re.DOTALL)
-    return match.group(0) if match else text
 
+def _json_default(obj: Any) -> Any:
+    """Fallback for values orjson cannot serialize natively (e.g. pandas Timestamp, Decimal)."""
+    handler = _JSON_DEFAULTS.get(type(obj))
+    if handler is None:
+        # Rare subclasses of date/datetime still serialize as ISO strings.
+        handler = _isoformat if isinstance(obj, date) else str
+    return handler(obj)
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize to compact JSON text; the LLM does not need pretty-printed input."""
+    return orjson.dumps(obj, default=_json_default, option=_ORJSON_OPTIONS).decode("utf-8")
 
-def _parse_llm_response(raw_response: str, retry_count: int = 0) -> Dict[str, Any]:
-    """Parse model output into JSON with minimal repair attempts."""
-    if not raw_response or not raw_response.strip():
-        raise ValueError("LLM returned empty response")
 
-    json_text = _extract_json_from_text(raw_response)
+def _cache_path(model: str, system_prompt: str, user_prompt: str) -> Path:
+    """Cache file for one request; any prompt, schema or data change yields a new key."""
+    digest = hashlib.sha256()
+    for part in (system_prompt.encode("utf-8"), user_prompt.encode("utf-8"), _SCHEMA_BYTES):
+        digest.update(part)
+        digest.update(b"\0")
+    return LLM_CACHE_DIR / model / f"{digest.hexdigest()}.json"
 
+
+def _read_cache(path: Path) -> List[Dict[str, Any]] | None:
+    """Return cached products, or None on a miss (including expired/unreadable/corrupt entries)."""
     try:
-        return json.loads(json_text)
-    except json.JSONDecodeError as e:
-        error_details = f"Position {e.pos}: {e.msg}"
+        if time.time() - path.stat().st_mtime > LLM_CACHE_TTL_SECONDS:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
 
-        json_text_fixed = re.sub(r",\s*([}\]])", r"\1", json_text)
-        try:
-            return json.loads(json_text_fixed)
-        except json.JSONDecodeError:
-            pass
 
-        try:
-            json_text_fixed = re.sub(
-                r'(":\s*")([^"]*)"([^,}\]]*)"', r"\1\2\\\"\3\\\"", json_text
-            )
-            return json.loads(json_text_fixed)
-        except json.JSONDecodeError:
-            pass
+def _prune_cache(cache_dir: Path) -> None:
+    """Delete expired entries, then the oldest ones beyond LLM_CACHE_MAX_ENTRIES."""
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".json"):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
 
-        raise ValueError(
-            f"Failed to parse LLM JSON response (attempt {retry_count + 1}).\n"
-            f"Error: {error_details}\n"
-            f"First 500 chars: {raw_response[:500]}"
-        )
+    entries.sort(reverse=True)
+    cutoff = time.time() - LLM_CACHE_TTL_SECONDS
+    for rank, (mtime, entry_path) in enumerate(entries):
+        if rank >= LLM_CACHE_MAX_ENTRIES or mtime < cutoff:
+            Path(entry_path).unlink(missing_ok=True)
+
+
+def _write_cache(path: Path, products: List[Dict[str, Any]]) -> None:
+    """Write atomically (temp file + os.replace) so concurrent readers never see partial JSON."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(products))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        _prune_cache(path.parent)
+    except OSError as e:
+        # The cache is an optimization only; a read-only or full disk must not fail extraction.
+        print(f"⚠️  LLM cache write skipped ({path.parent}): {e}")
 
 
 def _call_llm_extraction_for_chunk(
     chunk_data: str,
     model: str = "gpt-4o-mini",
     extract_price: bool = False,
-    attempt: int = 1,
 ) -> List[Dict[str, Any]]:
     """Extract structured products for a single chunk and return a list of product dicts."""
-    client = get_client()
     user_prompt = build_extraction_prompt(chunk_data, "excel", extract_price)
 
-    if attempt > 1:
-        user_prompt += (
-            "\n\nYour previous response had invalid JSON. Output ONLY valid JSON.\n"
-            "- No markdown or extra text\n"
-            "- No trailing commas\n"
-            "- Properly escaped strings\n"
-        )
+    cache_path = _cache_path(model, EXTRACTION_SYSTEM_PROMPT, user_prompt) if LLM_CACHE_ENABLED else None
+    if cache_path is not None:
+        cached = _read_cache(cache_path)
+        if cached is not None:
+            return cached
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0,
-            response_format={"type": "json_object"},
-        )
-    except Exception:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0,
+    client = get_client()
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0,
+        response_format=PRODUCTS_RESPONSE_FORMAT,
+    )
+
+    choice = response.choices[0]
+    if getattr(choice.message, "refusal", None):
+        raise ValueError(f"LLM refused the extraction request: {choice.message.refusal}")
+    if choice.finish_reason == "length":
+        raise ValueError(
+            "LLM output was truncated before the JSON was complete. "
+            "Try a smaller file or reduce rows/columns."
         )
 
-    raw_output = response.choices[0].message.content
+    raw_output = choice.message.content
     if not raw_output:
         raise ValueError("LLM returned empty response")
 
-    for retry in range(JSON_RETRY_ATTEMPTS):
-        try:
-            parsed = _parse_llm_response(raw_output, retry_count=retry)
-            if isinstance(parsed, dict) and "products" in parsed:
-                return parsed["products"]
-            return [parsed] if isinstance(parsed, dict) else parsed
-        except ValueError as e:
-            if retry >= JSON_RETRY_ATTEMPTS - 1:
-                raise ValueError(
-                    f"Failed to parse LLM response after {JSON_RETRY_ATTEMPTS} attempts.\n"
-                    f"Last error: {str(e)}\n"
-                    f"Try a smaller file or reduce rows/columns."
-                ) from e
-
-            fix_prompt = (
-                "The following JSON is invalid:\n\n"
-                f"{raw_output}\n\n"
-                f"Error: {str(e)}\n\n"
-                "Output ONLY the corrected valid JSON with no additional text."
-            )
-
-            fix_response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a JSON validator. Fix invalid JSON."},
-                    {"role": "user", "content": fix_prompt},
-                ],
-                temperature=0,
-            )
-            raw_output = fix_response.choices[0].message.content
-
-    raise ValueError("Unexpected error in JSON parsing retry loop")
+    products = orjson.loads(raw_output)["products"]
+    if cache_path is not None:
+        _write_cache(cache_path, products)
+    return products
+
+
+def _pack_chunks(row_sizes: List[int], max_rows: int, max_chars: int) -> List[Tuple[int, int]]:
+    """Greedily group consecutive rows into (start, end) chunks within both limits.
+
+    A single row larger than `max_chars` still gets a chunk of its own.
+    """
+    bounds: List[Tuple[int, int]] = []
+    start_idx = 0
+    chunk_chars = 2  # "[" + "]"
+
+    for idx, size in enumerate(row_sizes):
+        row_chars = size + (idx > start_idx)  # "," separator after the first row
+        if idx > start_idx and (idx - start_idx >= max_rows or chunk_chars + row_chars > max_chars):
+            bounds.append((start_idx, idx))
+            start_idx = idx
+            chunk_chars = 2
+            row_chars = size
+        chunk_chars += row_chars
+
+    bounds.append((start_idx, len(row_sizes)))
+    return bounds
 
 
 def process_excel_in_chunks(
@@ -171,36 +215,50 @@ def process_excel_in_chunks(
     model: str = "gpt-4o-mini",
     extract_price: bool = False,
     chunk_size: int = CHUNK_SIZE,
+    chunk_chars: int = CHUNK_TARGET_CHARS,
 ) -> List[Dict[str, Any]]:
     """Process Excel rows through the LLM in chunks and return merged product results."""
     total_rows = len(rows)
     if total_rows == 0:
         return []
 
-    sanitized_rows = _sanitize_for_json(rows)
+    sanitized_rows = _sanitize_rows(rows)
+
+    # Serialize each row exactly once. Chunks are (start, end) offsets into this shared list;
+    # each worker builds its own payload string, so all payloads never exist at once.
+    row_blobs = [_dumps(row) for row in sanitized_rows]
+    row_sizes = [len(blob) for blob in row_blobs]
+    chunk_bounds = _pack_chunks(row_sizes, chunk_size, chunk_chars)
 
-    full_json = json.dumps(sanitized_rows, indent=2, ensure_ascii=False)
-    total_chars = len(full_json)
+    # Equals the summed payload lengths: "[" + "]" per chunk plus a "," between rows.
+    total_chars = sum(row_sizes) + total_rows + len(chunk_bounds)
     if total_chars > MAX_TEXT_CHARS_BEFORE_LLM:
         raise ValueError(
             f"File content ({total_chars:,} characters) exceeds limit ({MAX_TEXT_CHARS_BEFORE_LLM:,}). "
             "Reduce file size by filtering rows/columns or splitting the file."
         )
 
-    if total_rows <= chunk_size:
-        return _call_llm_extraction_for_chunk(full_json, model, extract_price)
+    def extract_chunk(bounds: Tuple[int, int]) -> List[Dict[str, Any]]:
+        start_idx, end_idx = bounds
+        chunk_data = "[" + ",".join(row_blobs[start_idx:end_idx]) + "]"
+        return _call_llm_extraction_for_chunk(chunk_data, model, extract_price)
 
-    all_products: List[Dict[str, Any]] = []
-    num_chunks = (total_rows + chunk_size - 1) // chunk_size
-
-    for i in range(num_chunks):
-        start_idx = i * chunk_size
-        end_idx = min(start_idx + chunk_size, total_rows)
+    if len(chunk_bounds) == 1:
+        return extract_chunk(chunk_bounds[0])
 
-        chunk = sanitized_rows[start_idx:end_idx]
-        chunk_data = json.dumps(chunk, indent=2, ensure_ascii=False)
+    # Chunks are independent and network-bound: dispatch them concurrently.
+    # Results are collected in submission order, so products keep the original row order.
+    all_products: List[Dict[str, Any]] = []
+    max_workers = min(len(chunk_bounds), LLM_MAX_CONCURRENCY)
 
-        chunk_products = _call_llm_extraction_for_chunk(chunk_data, model, extract_price)
-        all_products.extend(chunk_products)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(extract_chunk, bounds) for bounds in chunk_bounds]
+        try:
+            for future in futures:
+                all_products.extend(future.result())
+        except BaseException:
+            # One failed chunk fails the file: drop queued chunks instead of waiting on them.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
 
     return all_products
@@ -3,22 +3,40 @@ OpenAI client factory.
 
 This module initializes environment variables (via dotenv) and exposes a single
 shared OpenAI client instance for the application. The client reads credentials
-(e.g., OPENAI_API_KEY) from the environment.
+(e.g., OPENAI_API_KEY) from the environment and is safe to share across threads.
+
+The underlying HTTP client speaks HTTP/2 with a pool large enough for concurrent chunk
+requests, so parallel calls multiplex over one connection instead of each paying for TLS.
+Rate-limit (429), server (5xx) and connection errors are retried by the client itself with
+exponential backoff, LLM_MAX_RETRIES times per request.
 """
 
 from __future__ import annotations
 
+import threading
+
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
+
+from config import LLM_MAX_RETRIES
 
 load_dotenv()
 
 _client: OpenAI | None = None
+_client_lock = threading.Lock()
+
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
 
 
 def get_client() -> OpenAI:
     """Return a singleton OpenAI client instance."""
     global _client
     if _client is None:
-        _client = OpenAI()
+        with _client_lock:
+            if _client is None:
+                _client = OpenAI(
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=DefaultHttpxClient(http2=True, limits=_HTTP_LIMITS),
+                )
     return _client
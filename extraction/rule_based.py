@@ -0,0 +1,196 @@
+"""
+Deterministic extraction for rows whose headers map cleanly onto canonical fields.
+
+Implements the column-name rules from EXTRACTION_SYSTEM_PROMPT as an ordered list of
+regexes over normalized header names. A row takes this fast path only when every
+non-empty cell sits under a recognised header and every word of the description is on an
+English allow-list; everything else is left for the LLM.
+
+Content, CA/CSE and description cleanup are handled later by the pipeline's
+normalization step, exactly as for LLM output.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+_RE_HEADER_SEP = re.compile(r"[^A-Z0-9]+")
+
+_RE_LAYER = re.compile(r"\bLAYERS?\b")
+_RE_CASE_PRICE = re.compile(r"\bPRICE\b.*\b(?:CASE|CARTON|CS|CT)\b|\b(?:CASE|CARTON)\b.*\bPRICE\b")
+
+_AVAILABLE = r"(?=.*\b(?:AVAILABLE|AVAILABILITY|IN STOCK|ON HAND)\b)"
+
+# Ordered (field, pattern) rules; the first match wins. A field of None means the column
+# is known but intentionally ignored (e.g. case EANs, which must never become `ean`).
+_HEADER_RULES: List[Tuple[Optional[str], re.Pattern[str]]] = [
+    (None, re.compile(r"\b(?:EAN|GTIN|GENCOD)\b.*\b(?:CASE|CARTON|COLIS|CS|CT|OUTER)\b"
+                      r"|\b(?:CASE|CARTON|COLIS|OUTER)\b.*\b(?:EAN|GTIN|GENCOD)\b|\b(?:DUN|ITF) ?14\b")),
+    ("ean", re.compile(r"\b(?:EAN|GTIN|GENCOD|BARCODE)\b")),
+    ("availability_cartons", re.compile(_AVAILABLE + r".*\b(?:CASES?|CARTONS?)\b")),
+    ("availability_pieces", re.compile(_AVAILABLE + r".*\b(?:PIECES?|UNITS?|PCS)\b")),
+    ("availability_pallets", re.compile(_AVAILABLE + r".*\bPALLETS?\b")),
+    ("availability_pieces", re.compile(r"^STOCK(?: CURRENT)?$")),
+    ("pieces_per_pallet", re.compile(r"\b(?:PIECES?|UNITS?|PCS|CON)\b (?:PER )?(?:PALLET|PAL)\b")),
+    ("case_per_pallet", re.compile(r"\b(?:CASES?|CSE|CS|CT)\b (?:PER )?(?:PALLET|PAL)\b")),
+    ("piece_per_case", re.compile(r"\b(?:UNITS?|PIECES?|PCS?)\b (?:PER )?(?:CASE|CSE)\b|^CASE SIZE$")),
+    ("case_per_pallet", re.compile(r"^(?:PALLET|PAL|PLT)$")),
+    ("content", re.compile(r"^(?:CONTENT|NET CONTENT|NET WEIGHT|WEIGHT|VOLUME)$")),
+    ("languages", re.compile(r"^LANGUAGES?$")),
+    ("bbd", re.compile(r"\b(?:BBD|BEST BEFORE|THT|EXPIRY|EXPIRATION|SHELF LIFE)\b")),
+    ("price_unit_eur", re.compile(r"^(?:UNIT PRICE|PRICE UNIT|PRICE PER (?:UNIT|PIECE)|PRICE)(?: EUR)?$")),
+    ("product_description", re.compile(r"^(?:PRODUCT|DESCRIPTION|PRODUCT DESCRIPTION|PRODUCT NAME"
+                                       r"|ARTICLE|ARTICLE DESCRIPTION|ITEM|ITEM DESCRIPTION)$")),
+]
+
+_NUMERIC_FIELDS = frozenset({
+    "piece_per_case", "case_per_pallet", "pieces_per_pallet",
+    "availability_cartons", "availability_pieces", "availability_pallets",
+    "price_unit_eur",
+})
+
+# A description is final only when every word is plain English product vocabulary: anything
+# else (brands, abbreviations, non-English terms) may need translation or expansion, which
+# the prompt leaves to the model.
+_ENGLISH_WORDS = frozenset("""
+    A AND FOR FROM IN OF ON THE WITH WITHOUT NO FREE EXTRA MINI MAXI BIG SMALL LARGE
+    ORIGINAL CLASSIC NATURAL ORGANIC LIGHT ZERO SUGAR SALT FAT LOW HIGH RICH PURE FRESH
+    DARK WHITE MILK BLACK GREEN RED YELLOW BLUE PINK GOLD SILVER
+    CHOCOLATE COCOA CARAMEL VANILLA HAZELNUT HAZELNUTS NUT NUTS ALMOND ALMONDS PEANUT
+    PEANUTS COCONUT HONEY BUTTER CREAM CHEESE YOGURT YOGHURT MINT COFFEE TEA
+    BISCUIT BISCUITS COOKIE COOKIES CAKE CAKES WAFER WAFERS BAR BARS CANDY CANDIES SWEETS
+    GUM GUMMIES JELLY BEANS CRISPS CHIPS CRACKERS PRETZELS POPCORN CEREAL CEREALS BREAD
+    PASTA RICE SAUCE SOUP OIL VINEGAR KETCHUP MAYONNAISE MUSTARD SPREAD JAM
+    DRINK DRINKS JUICE WATER SPARKLING STILL SODA COLA LEMONADE ENERGY
+    FRUIT FRUITS APPLE ORANGE LEMON LIME STRAWBERRY STRAWBERRIES RASPBERRY RASPBERRIES
+    CHERRY BANANA MANGO PEACH PINEAPPLE GRAPE BERRY BERRIES BLUEBERRY TOMATO
+    SHAMPOO CONDITIONER SHOWER BATH GEL SOAP HAND BODY FACE HAIR LOTION DEODORANT SPRAY
+    ROLL TOOTHPASTE TOOTHBRUSH MOUTHWASH RAZOR RAZORS BLADES SHAVING FOAM WASH CLEANSER
+    HAIRSPRAY WAX STYLING HOLD STRONG SENSITIVE DRY OILY NORMAL SKIN CARE MEN WOMEN
+    BABY KIDS MONTHS YEARS STAGE DETERGENT LIQUID POWDER CAPSULES PODS TABLETS SOFTENER
+    DISHWASHER DISH CLEANER BLEACH WIPES TISSUES TOILET PAPER KITCHEN TOWELS
+    SCENT SCENTED FRAGRANCE UNSCENTED FLAVOUR FLAVOR FLAVOURED FLAVORED
+""".split())
+
+# Bare numbers and number+unit tokens; the pipeline moves content out of the description.
+_RE_QUANTITY_TOKEN = re.compile(r"^\d+(?:X|G|GR|KG|ML|CL|L)?$")
+
+# A content cell must carry its unit ("500 GR", "1,5L"); a bare "500" is left to the model,
+# which can infer the unit from the header or the rest of the row.
+_RE_CONTENT_WITH_UNIT = re.compile(r"\d\s*(?:G|GR|GRS|KG|ML|CL|L|LT|LTR)\b")
+
+
+def _normalize_header(header: Any) -> str:
+    return _RE_HEADER_SEP.sub(" ", str(header).upper()).strip()
+
+
+def map_header(header: Any) -> Tuple[bool, Optional[str]]:
+    """Return (known, field) for a supplier column header."""
+    normalized = _normalize_header(header)
+    for field, pattern in _HEADER_RULES:
+        if pattern.search(normalized):
+            return True, field
+    return False, None
+
+
+def _cell_text(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _is_plain_number(value: Any) -> bool:
+    """Numbers with units or free text ("2 pal", "€1,50") are left to the model."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    return str(value).strip().isdigit()
+
+
+def _description_is_final(description: str) -> bool:
+    if not description.isascii():
+        return False
+    tokens = _RE_HEADER_SEP.split(description.upper())
+    return all(
+        not t or t in _ENGLISH_WORDS or _RE_QUANTITY_TOKEN.match(t)
+        for t in tokens
+    )
+
+
+def extract_row(
+    row: Dict[str, Any],
+    extract_price: bool = False,
+    header_map: Optional[Dict[str, Tuple[bool, Optional[str]]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Map one raw Excel row to a product dict, or return None if the LLM is needed."""
+    product: Dict[str, Any] = {}
+
+    for header, value in row.items():
+        if value is None or value == "":
+            continue
+
+        known, field = header_map[header] if header_map is not None else map_header(header)
+        if not known:
+            return None
+        if field is None or (field == "price_unit_eur" and not extract_price):
+            continue
+        if field in product:
+            return None
+
+        if field in _NUMERIC_FIELDS and not _is_plain_number(value):
+            return None
+
+        # Dates stay date objects so both extraction paths share one BBD format (to_canonical).
+        if field in _NUMERIC_FIELDS or isinstance(value, date):
+            product[field] = value
+        else:
+            product[field] = _cell_text(value)
+
+    content = product.get("content")
+    if content is not None and not _RE_CONTENT_WITH_UNIT.search(content.upper()):
+        return None
+
+    description = product.get("product_description")
+    if not description or not _description_is_final(description):
+        return None
+    product["product_description"] = description.upper()
+
+    return product
+
+
+def split_rows(
+    rows: List[Dict[str, Any]],
+    extract_price: bool = False,
+) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+    """
+    Partition rows into deterministic products and rows that still need the LLM.
+
+    Returns:
+        ({row_index: product}, [row_index, ...] needing the LLM)
+    """
+    header_map: Dict[str, Tuple[bool, Optional[str]]] = {}
+    for row in rows:
+        for header in row:
+            if header not in header_map:
+                header_map[header] = map_header(header)
+
+    # "Layer" is only a fallback for case_per_pallet and price-per-case needs division;
+    # both depend on the rest of the sheet, so leave such sheets to the model.
+    for header in header_map:
+        normalized = _normalize_header(header)
+        if _RE_LAYER.search(normalized) or (extract_price and _RE_CASE_PRICE.search(normalized)):
+            return {}, list(range(len(rows)))
+
+    local: Dict[int, Dict[str, Any]] = {}
+    pending: List[int] = []
+    for idx, row in enumerate(rows):
+        product = extract_row(row, extract_price, header_map)
+        if product is None:
+            pending.append(idx)
+        else:
+            local[idx] = product
+
+    return local, pending
@@ -0,0 +1,59 @@
+"""
+JSON Schema for structured LLM extraction output.
+
+The schema is derived from the CanonicalRow TypedDict so the model contract and the
+canonical structure cannot drift apart. It is passed to OpenAI structured outputs
+(`response_format={"type": "json_schema", ...}` in strict mode), which guarantees
+schema-valid JSON at decode time.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, get_args, get_type_hints
+
+from domain.canonical import CanonicalRow
+
+# Provenance fields are filled by the pipeline, never by the model.
+_EXCLUDED_FIELDS = ("source_file", "source_row")
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number"}
+
+
+def _json_type(annotation: Any) -> str:
+    """Map an Optional[...] field annotation to its JSON Schema type name."""
+    args = [a for a in get_args(annotation) if a is not type(None)]
+    return _JSON_TYPES[args[0] if args else annotation]
+
+
+def build_products_schema() -> Dict[str, Any]:
+    """Build the strict `{"products": [CanonicalRow, ...]}` schema (all fields nullable)."""
+    hints = get_type_hints(CanonicalRow)
+    properties = {
+        name: {"type": [_json_type(annotation), "null"]}
+        for name, annotation in hints.items()
+        if name not in _EXCLUDED_FIELDS
+    }
+
+    product = {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+    return {
+        "type": "object",
+        "properties": {"products": {"type": "array", "items": product}},
+        "required": ["products"],
+        "additionalProperties": False,
+    }
+
+
+PRODUCTS_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "products",
+        "schema": build_products_schema(),
+        "strict": True,
+    },
+}
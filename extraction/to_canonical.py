@@ -12,32 +12,43 @@ Core responsibilities:
 - Build LLM prompts and call the OpenAI client.
 - Parse model output into JSON reliably (including markdown-wrapped JSON).
 - Convert extracted dicts into CanonicalRow with type normalization.
-- For Excel, optionally chunk large inputs and pre-extract simple content patterns as a fallback.
+- For Excel, map rows with recognised headers locally (see rule_based), chunk the rest for
+  the LLM, and pre-extract simple content patterns as a fallback.
 """
 
 from __future__ import annotations
 
 import json
 import re
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
+import pandas as pd
+
 from domain.canonical import CanonicalRow
 from input_readers import read_excel, read_image_as_data_url, read_pdf
 
 from .chunked_processor import process_excel_in_chunks
 from .llm_client import get_client
 from .prompts import EXTRACTION_SYSTEM_PROMPT, build_extraction_prompt
+from .rule_based import split_rows
 from fields.normalization import to_float, to_int
 
+_RE_CONTENT = re.compile(r"\b(\d+(?:[.,]\d+)?)\s*(GR|KG|ML|L)\b")
+_RE_FENCE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+_RE_FENCE_STRIP = re.compile(r"```(?:json)?")
+_RE_OBJ = re.compile(r"\{.*\}", re.DOTALL)
+# ISO dates as serialized for the model ("2025-06-30", "2025-06-30T00:00:00") or as str(datetime).
+_RE_ISO_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})(?:[T ]00:00:00(?:\.0+)?)?$")
+
 
 def _extract_content_from_text(text: str) -> str | None:
     """Extract a simple content pattern like 187GR, 1.5KG, 330ML from arbitrary text."""
     if not text:
         return None
 
-    pattern = r"\b(\d+(?:[.,]\d+)?)\s*(GR|KG|ML|L)\b"
-    match = re.search(pattern, text.upper())
+    match = _RE_CONTENT.search(text.upper())
     if not match:
         return None
 
@@ -47,19 +58,40 @@ def _extract_content_from_text(text: str) -> str | None:
 
 
 def _pre_extract_content_from_rows(rows: List[Dict]) -> List[str | None]:
-    """Pre-extract content patterns from raw Excel rows as a fallback if the LLM misses it."""
-    extracted: List[str | None] = []
-
-    for row in rows:
-        content = None
-        for value in row.values():
-            if value:
-                content = _extract_content_from_text(str(value))
-                if content:
-                    break
-        extracted.append(content)
-
-    return extracted
+    """Pre-extract content patterns from raw Excel rows as a fallback if the LLM misses it.
+
+    Each row's cells are joined into one string and searched with a single vectorized
+    `str.extract` pass. The "|" separator is a non-space word boundary, so a match can never
+    span two cells and the first match is the one from the left-most matching cell.
+    """
+    if not rows:
+        return []
+
+    cells = pd.DataFrame(rows, dtype=object)
+    if cells.columns.empty:
+        return [None] * len(rows)
+
+    text = cells.fillna("").astype(str).agg("|".join, axis=1).str.upper()
+
+    match = text.str.extract(_RE_CONTENT)
+    content = match[0].str.replace(",", ".", regex=False) + match[1]
+    return content.astype(object).where(content.notna(), None).tolist()
+
+
+def _format_bbd(value: Any) -> Any:
+    """Format date BBDs as DD/MM/YYYY, whether they come from a cell or from the model."""
+    if isinstance(value, datetime):
+        if value.time() == datetime.min.time():
+            return value.strftime("%d/%m/%Y")
+        return value.strftime("%d/%m/%Y %H:%M")
+    if isinstance(value, date):
+        return value.strftime("%d/%m/%Y")
+    if isinstance(value, str):
+        match = _RE_ISO_DATE.match(value.strip())
+        if match:
+            year, month, day = match.groups()
+            return f"{day}/{month}/{year}"
+    return value
 
 
 def _parse_llm_response(raw_response: str) -> Dict[str, Any]:
@@ -67,16 +99,16 @@ def _parse_llm_response(raw_response: str) -> Dict[str, Any]:
     raw = (raw_response or "").strip()
 
     if raw.startswith("```"):
-        match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", raw, flags=re.DOTALL)
+        match = _RE_FENCE.search(raw)
         if match:
             raw = match.group(1)
         else:
-            raw = re.sub(r"```(?:json)?", "", raw).strip()
+            raw = _RE_FENCE_STRIP.sub("", raw).strip()
 
     try:
         return json.loads(raw)
     except json.JSONDecodeError as e:
-        match = re.search(r"\{.*\}", raw, flags=re.DOTALL)
+        match = _RE_OBJ.search(raw)
         if not match:
             raise ValueError(f"LLM did not return valid JSON. Error: {e}\nGot: {raw[:500]}")
         return json.loads(match.group(0))
@@ -122,7 +154,7 @@ def _dict_to_canonical(product: Dict[str, Any], source_file: str, source_row: in
         piece_per_case=to_int(product.get("piece_per_case")),
         case_per_pallet=to_int(product.get("case_per_pallet")),
         pieces_per_pallet=to_int(product.get("pieces_per_pallet")),
-        bbd=product.get("bbd"),
+        bbd=_format_bbd(product.get("bbd")),
         availability_pieces=to_int(product.get("availability_pieces")),
         availability_cartons=to_int(product.get("availability_cartons")),
         availability_pallets=to_int(product.get("availability_pallets")),
@@ -142,15 +174,28 @@ def excel_to_canonical(
     rows = read_excel(xlsx_path, sheet_name=sheet_name)
 
     pre_extracted_content = _pre_extract_content_from_rows(rows)
-    products = process_excel_in_chunks(rows, model, extract_price)
 
-    canonical_rows = [
-        _dict_to_canonical(p, str(xlsx_path), idx) for idx, p in enumerate(products, start=1)
-    ]
+    # Rows with fully recognised headers are mapped locally; only the rest cost an LLM call.
+    local_products, pending = split_rows(rows, extract_price)
+    llm_products = (
+        process_excel_in_chunks([rows[i] for i in pending], model, extract_price) if pending else []
+    )
 
-    for i, row in enumerate(canonical_rows):
-        if not row.get("content") and i < len(pre_extracted_content) and pre_extracted_content[i]:
-            row["content"] = pre_extracted_content[i]
+    # Pair each product with the sheet row it came from, for the content fallback below.
+    if len(llm_products) == len(pending):
+        by_index = {**local_products, **dict(zip(pending, llm_products))}
+        sourced = sorted(by_index.items())
+    else:
+        # The model split or merged rows, so its products no longer map to sheet rows and get
+        # no content fallback; local products keep their own rows.
+        sourced = sorted(local_products.items()) + [(None, p) for p in llm_products]
+
+    canonical_rows = []
+    for idx, (source_idx, p) in enumerate(sourced, start=1):
+        row = _dict_to_canonical(p, str(xlsx_path), idx)
+        if not row.get("content") and source_idx is not None and pre_extracted_content[source_idx]:
+            row["content"] = pre_extracted_content[source_idx]
+        canonical_rows.append(row)
 
     return canonical_rows
 
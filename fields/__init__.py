@@ -1,6 +1,12 @@
 """Field utilities and article number generation."""
 
-from .article_number import allocate, peek_next, ArticleNumberError
+from .article_number import (
+    allocate,
+    allocation_batch,
+    peek_next,
+    ArticleNumberAllocator,
+    ArticleNumberError,
+)
 from .normalization import (
     clean_description_from_content,
     extract_content_from_description,
@@ -11,6 +17,7 @@ from .normalization import (
 )
 from .packaging_math import (
     apply_packaging_math, 
+    apply_packaging_math_bulk,
     complete_availability, 
     complete_packaging_triad,
     apply_double_stackable,
@@ -18,7 +25,9 @@ from .packaging_math import (
 
 __all__ = [
     "allocate",
+    "allocation_batch",
     "peek_next",
+    "ArticleNumberAllocator",
     "ArticleNumberError",
     "to_int",
     "to_float",
@@ -27,6 +36,7 @@ __all__ = [
     "extract_content_from_description",
     "clean_description_from_content",
     "apply_packaging_math",
+    "apply_packaging_math_bulk",
     "complete_packaging_triad",
     "complete_availability",
     "apply_double_stackable",
@@ -11,27 +11,37 @@ CHANGE REQUEST:
 from __future__ import annotations
 
 import math
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Dict, Optional, Union
 
 from domain.canonical import CanonicalRow
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
 Number = Union[int, float]
 
+_TRIAD_KEYS = ("piece_per_case", "case_per_pallet", "pieces_per_pallet")
+_AVAILABILITY_KEYS = ("availability_pieces", "availability_cartons", "availability_pallets")
+# Every field the packaging math reads or writes.
+_MATH_KEYS = _TRIAD_KEYS + _AVAILABILITY_KEYS
+
 
 def _to_number(value) -> Optional[float]:
     """Convert int/float (or numeric-like strings) to float. Return None if not possible."""
-    if value is None:
-        return None
-    if isinstance(value, bool):
-        return None
-    if isinstance(value, (int, float)):
+    # Numbers dominate; bool is an int subclass but never a quantity.
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
         return float(value)
+    if value is None or isinstance(value, bool):
+        return None
 
     try:
-        s = str(value).strip()
+        s = value.strip() if isinstance(value, str) else str(value).strip()
         if not s:
             return None
-        s = s.replace(",", ".")
+        # Only decimal-comma strings pay for a new string.
+        if "," in s:
+            s = s.replace(",", ".")
         return float(s)
     except Exception:
         return None
@@ -43,34 +53,25 @@ def _is_valid_positive_number(value) -> bool:
     return v is not None and v > 0
 
 
-def _ceil_int(value) -> Optional[int]:
-    """
-    Convert numeric-like value to an integer by ALWAYS rounding up (ceil).
-    Returns None if not convertible or <= 0.
-    """
-    v = _to_number(value)
-    if v is None or v <= 0:
-        return None
-    return int(math.ceil(v))
-
-
 def _finalize_availability_ints(row: CanonicalRow) -> CanonicalRow:
     """
     Enforce integer availability fields (ceil).
     This removes .0 display and guarantees integer outputs.
     """
-    for k in ("availability_pieces", "availability_cartons", "availability_pallets"):
-        vi = _ceil_int(row.get(k))
-        row[k] = vi if vi is not None else row.get(k)
-        # If it was non-numeric junk, keep as-is (or you can force to None)
-        if _to_number(row.get(k)) is None:
+    for k in _AVAILABILITY_KEYS:
+        # One parse per field: positive -> ceil int, non-numeric junk -> None,
+        # other numbers (zero/negative) are kept as-is.
+        v = _to_number(row.get(k))
+        if v is None:
             row[k] = None
+        elif v > 0:
+            row[k] = int(math.ceil(v))
     return row
 
 
 def apply_double_stackable(row: CanonicalRow) -> CanonicalRow:
     """Double stackable = multiply availability values by 2, then force integer (ceil)."""
-    for k in ("availability_pieces", "availability_cartons", "availability_pallets"):
+    for k in _AVAILABILITY_KEYS:
         v = _to_number(row.get(k))
         if v is not None and v > 0:
             row[k] = v * 2
@@ -116,6 +117,7 @@ def complete_availability(row: CanonicalRow) -> CanonicalRow:
     - NEVER compute negatives / zeros
     - Supplier-provided values take precedence (we compute only missing fields)
     """
+    # Parse each field once; `pieces` is kept in sync when it gets filled below.
     pieces = _to_number(row.get("availability_pieces"))
     cartons = _to_number(row.get("availability_cartons"))
     pallets = _to_number(row.get("availability_pallets"))
@@ -123,47 +125,174 @@ def complete_availability(row: CanonicalRow) -> CanonicalRow:
     ppc = _to_number(row.get("piece_per_case"))
     ppp = _to_number(row.get("pieces_per_pallet"))
 
-    # FORWARD (Pieces -> Cartons/Pallets)
-    if _is_valid_positive_number(pieces):
-        if row.get("availability_cartons") is None and _is_valid_positive_number(ppc) and ppc != 0:
-            row["availability_cartons"] = math.ceil(pieces / ppc)
-
-        if row.get("availability_pallets") is None and _is_valid_positive_number(ppp) and ppp != 0:
-            row["availability_pallets"] = math.ceil(pieces / ppp)
+    has_ppc = ppc is not None and ppc > 0
+    has_ppp = ppp is not None and ppp > 0
 
     # REVERSE (Cartons/Pallets -> Pieces) only if Pieces missing
     if row.get("availability_pieces") is None:
-        if _is_valid_positive_number(cartons) and _is_valid_positive_number(ppc):
+        if cartons is not None and cartons > 0 and has_ppc:
             # multiplication should be integer-safe, but still ceil+int for safety
             row["availability_pieces"] = math.ceil(cartons * ppc)
-            pieces = _to_number(row.get("availability_pieces"))
+            pieces = float(row["availability_pieces"])
 
-        elif _is_valid_positive_number(pallets) and _is_valid_positive_number(ppp):
+        elif pallets is not None and pallets > 0 and has_ppp:
             row["availability_pieces"] = math.ceil(pallets * ppp)
-            pieces = _to_number(row.get("availability_pieces"))
+            pieces = float(row["availability_pieces"])
 
-    # CROSS-FILL if Pieces is now known
-    pieces = _to_number(row.get("availability_pieces"))
-    if _is_valid_positive_number(pieces):
-        if row.get("availability_cartons") is None and _is_valid_positive_number(ppc) and ppc != 0:
+    # FORWARD / CROSS-FILL (Pieces -> Cartons/Pallets), from supplier or derived pieces
+    if pieces is not None and pieces > 0:
+        if row.get("availability_cartons") is None and has_ppc:
             row["availability_cartons"] = math.ceil(pieces / ppc)
 
-        if row.get("availability_pallets") is None and _is_valid_positive_number(ppp) and ppp != 0:
+        if row.get("availability_pallets") is None and has_ppp:
             row["availability_pallets"] = math.ceil(pieces / ppp)
 
     # FINAL: force integer availability fields (also removes .0 for provided numbers)
     return _finalize_availability_ints(row)
 
 
-def apply_packaging_math(row: CanonicalRow, max_iterations: int = 3) -> CanonicalRow:
-    """Apply packaging + availability math iteratively."""
-    for _ in range(max_iterations):
-        before = dict(row)
+def _has_non_numeric_availability(row: CanonicalRow) -> bool:
+    """True if an availability field holds junk that finalization will reset to None."""
+    return any(
+        row.get(k) is not None and _to_number(row.get(k)) is None
+        for k in _AVAILABILITY_KEYS
+    )
 
-        row = complete_packaging_triad(row)
-        row = complete_availability(row)
 
-        if dict(row) == before:
-            break
+def apply_packaging_math(row: CanonicalRow) -> CanonicalRow:
+    """
+    Apply packaging + availability math in dependency order.
+
+    The triad only reads packaging fields and fills the missing one, so one pass settles it;
+    availability then derives from the completed triad. Availability needs a second pass
+    only when it had non-numeric junk: finalization resets that to None, which makes the
+    field fillable from the others.
+    """
+    row = complete_packaging_triad(row)
+
+    needs_second_pass = _has_non_numeric_availability(row)
+    row = complete_availability(row)
+    if needs_second_pass:
+        row = complete_availability(row)
 
     return row
+
+
+# ---------------------------------------------------------------------------
+# Bulk (column-wise) variant
+#
+# numpy/pandas are imported inside these functions: the per-row API above (used by the
+# pipeline and CLI) stays dependency-free, and only bulk callers need them installed.
+# ---------------------------------------------------------------------------
+
+def _numeric_column(values: np.ndarray) -> np.ndarray:
+    """Vectorized `_to_number` over an object array: float64, NaN where not convertible."""
+    import numpy as np
+    import pandas as pd
+
+    series = pd.Series(values, dtype=object)
+    if pd.api.types.infer_dtype(series, skipna=True) in ("integer", "floating", "mixed-integer-float", "empty"):
+        # Fast path: only real numbers and missing values.
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+
+    text = series.astype(str).str.strip().str.replace(",", ".", regex=False)
+    numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    is_bool = series.map(type).isin([bool, np.bool_]).to_numpy()
+    numbers[is_bool | series.isna().to_numpy()] = np.nan
+    return numbers
+
+
+def _set(col: np.ndarray, mask: np.ndarray, values: np.ndarray, as_int: bool = False) -> None:
+    """Write `values[mask]` into an object column as Python int/float (like the row API)."""
+    picked = values[mask]
+    col[mask] = (picked.astype("int64") if as_int else picked).tolist()
+
+
+def _availability_pass(
+    cols: Dict[str, np.ndarray],
+    nums: Dict[str, np.ndarray],
+    ppc: np.ndarray,
+    ppp: np.ndarray,
+) -> None:
+    """One vectorized `complete_availability` over all rows, updating `cols`/`nums` in place.
+
+    `nums` holds the parsed value of each availability column (NaN = missing or junk) and
+    is kept in sync with `cols`, so passes never re-parse the object columns.
+    """
+    import numpy as np
+    import pandas as pd
+
+    pieces, cartons, pallets = (nums[k] for k in _AVAILABILITY_KEYS)
+    has_ppc = ppc > 0
+    has_ppp = ppp > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # REVERSE (Cartons/Pallets -> Pieces) only if Pieces missing
+        pieces_missing = pd.isna(cols["availability_pieces"])
+        from_cartons = pieces_missing & (cartons > 0) & has_ppc
+        from_pallets = pieces_missing & ~from_cartons & (pallets > 0) & has_ppp
+        pieces[from_cartons] = np.ceil(cartons * ppc)[from_cartons]
+        pieces[from_pallets] = np.ceil(pallets * ppp)[from_pallets]
+        _set(cols["availability_pieces"], from_cartons | from_pallets, pieces, as_int=True)
+
+        # FORWARD / CROSS-FILL (Pieces -> Cartons/Pallets)
+        fill_cartons = pd.isna(cols["availability_cartons"]) & (pieces > 0) & has_ppc
+        cartons[fill_cartons] = np.ceil(pieces / ppc)[fill_cartons]
+        _set(cols["availability_cartons"], fill_cartons, cartons, as_int=True)
+
+        fill_pallets = pd.isna(cols["availability_pallets"]) & (pieces > 0) & has_ppp
+        pallets[fill_pallets] = np.ceil(pieces / ppp)[fill_pallets]
+        _set(cols["availability_pallets"], fill_pallets, pallets, as_int=True)
+
+    # FINAL: ceil positive values to int, reset non-numeric junk to None, keep the rest
+    for k in _AVAILABILITY_KEYS:
+        col, numbers = cols[k], nums[k]
+        positive = numbers > 0
+        numbers[positive] = np.ceil(numbers[positive])
+        _set(col, positive, numbers, as_int=True)
+        col[np.isnan(numbers) & ~pd.isna(col)] = None
+
+
+def apply_packaging_math_bulk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column-wise equivalent of `apply_packaging_math` for a whole frame of canonical rows.
+
+    Returns a copy with the triad and availability columns (object dtype) holding the same
+    values the per-row API would produce. Unlike the per-row API, NaN counts as missing.
+    """
+    import numpy as np
+    import pandas as pd
+
+    out = df.copy()
+    cols: Dict[str, np.ndarray] = {}
+    for k in _MATH_KEYS:
+        col = out[k].to_numpy(dtype=object, copy=True) if k in out.columns else np.full(len(out), None, dtype=object)
+        col[pd.isna(col)] = None
+        cols[k] = col
+
+    a, b, c = (_numeric_column(cols[k]) for k in _TRIAD_KEYS)
+    a_missing, b_missing, c_missing = (pd.isna(cols[k]) for k in _TRIAD_KEYS)
+
+    # Packaging triad (2-of-3 rule), all three rules read the original values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill_c = c_missing & (a > 0) & (b > 0)
+        fill_b = b_missing & (a > 0) & (c > 0)
+        fill_a = a_missing & (b > 0) & (c > 0)
+        new_c, new_b, new_a = a * b, c / a, c / b
+
+    _set(cols["pieces_per_pallet"], fill_c, new_c)
+    _set(cols["case_per_pallet"], fill_b, new_b)
+    _set(cols["piece_per_case"], fill_a, new_a)
+
+    ppc = np.where(fill_a, new_a, a)
+    ppp = np.where(fill_c, new_c, c)
+
+    # Second pass mirrors the row API's re-run after junk availability is reset to None;
+    # for rows without junk it changes nothing.
+    nums = {k: _numeric_column(cols[k]) for k in _AVAILABILITY_KEYS}
+    _availability_pass(cols, nums, ppc, ppp)
+    _availability_pass(cols, nums, ppc, ppp)
+
+    for k, col in cols.items():
+        out[k] = pd.Series(col, index=out.index, dtype=object)
+    return out
@@ -3,15 +3,67 @@ EXCEL READER
 ------------
 Reads Excel files into raw dict format with NO transformation.
 Returns list of dicts with original supplier column names.
+
+Parsing uses the Rust-backed python-calamine reader when it is installed and falls back
+to openpyxl (streaming read-only mode) otherwise. Calamine values are normalized towards
+openpyxl's: empty strings become None, integral floats become ints and date-only cells
+become midnight datetimes, and a missing sheet raises the same KeyError. Time and
+duration cells are passed through as each backend returns them.
 """
 
 from __future__ import annotations
 
+from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Sequence
 
 from openpyxl import load_workbook
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # optional dependency
+    CalamineWorkbook = None
+
+
+def _calamine_value(value: Any) -> Any:
+    """Map calamine cell values onto what openpyxl would return."""
+    if value == "":
+        return None
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _iter_rows_calamine(xlsx_path: Path, sheet_name: str | None) -> Iterator[Sequence[Any]]:
+    try:
+        with xlsx_path.open("rb") as f:
+            wb = CalamineWorkbook.from_filelike(f)
+    except Exception as e:
+        raise ValueError(f"Cannot read Excel file (is it corrupted or wrong format?): {e}")
+
+    if sheet_name and sheet_name not in wb.sheet_names:
+        raise KeyError(f"Worksheet {sheet_name} does not exist.")
+    sheet = wb.get_sheet_by_name(sheet_name or wb.sheet_names[0])
+    # skip_empty_area=False keeps row 1 as the header row even if leading rows are blank.
+    for values in sheet.to_python(skip_empty_area=False):
+        yield [_calamine_value(v) for v in values]
+
+
+def _iter_rows_openpyxl(xlsx_path: Path, sheet_name: str | None) -> Iterator[Sequence[Any]]:
+    try:
+        # read_only streams rows from the XML instead of building every Cell object up front.
+        wb = load_workbook(xlsx_path, data_only=True, read_only=True)
+    except Exception as e:
+        raise ValueError(f"Cannot read Excel file (is it corrupted or wrong format?): {e}")
+
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
 
 def read_excel(xlsx_path: Path, sheet_name: str | None = None) -> List[Dict[str, Any]]:
     """
@@ -33,33 +85,27 @@ def read_excel(xlsx_path: Path, sheet_name: str | None = None) -> List[Dict[str,
     if not xlsx_path.exists():
         raise FileNotFoundError(f"Excel file not found: {xlsx_path}")
 
-    try:
-        wb = load_workbook(xlsx_path, data_only=True)
-    except Exception as e:
-        raise ValueError(f"Cannot read Excel file (is it corrupted or wrong format?): {e}")
+    iter_rows = _iter_rows_calamine if CalamineWorkbook is not None else _iter_rows_openpyxl
+    values_iter = iter_rows(xlsx_path, sheet_name)
 
-    ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+    try:
+        # Extract headers from row 1
+        header_row = next(values_iter, None)
+        if header_row is None:
+            return []
+        headers: List[str] = [
+            str(h).strip() if h is not None else f"col_{c}"
+            for c, h in enumerate(header_row, start=1)
+        ]
 
-    # Extract headers from row 1
-    headers: List[str] = []
-    for c in range(1, ws.max_column + 1):
-        h = ws.cell(row=1, column=c).value
-        headers.append(str(h).strip() if h is not None else f"col_{c}")
+        # Extract data rows (skip empty rows); short rows are padded with None per header
+        rows: List[Dict[str, Any]] = []
+        for values in values_iter:
+            if any(v not in (None, "") for v in values):
+                row: Dict[str, Any] = dict.fromkeys(headers)
+                row.update(zip(headers, values))
+                rows.append(row)
+    finally:
+        values_iter.close()
 
-    # Extract data rows (skip empty rows)
-    rows: List[Dict[str, Any]] = []
-    for r in range(2, ws.max_row + 1):
-        row: Dict[str, Any] = {}
-        is_empty = True
-        
-        for c, header in enumerate(headers, start=1):
-            value = ws.cell(row=r, column=c).value
-            if value not in (None, ""):
-                is_empty = False
-            row[header] = value
-            
-        if not is_empty:
-            rows.append(row)
-
-    wb.close()
-    return rows
\ No newline at end of file
+    return rows
@@ -10,6 +10,31 @@ import base64
 import mimetypes
 from pathlib import Path
 
+# Multiple of 3, so every chunk encodes to whole base64 quanta with no padding in between.
+_B64_READ_CHUNK = 3 * 64 * 1024
+
+
+def _resolve_image(image_path: Path) -> tuple[Path, str]:
+    """Resolve the path, check it exists and guess its MIME type (PNG if unknown)."""
+    image_path = image_path.expanduser().resolve()
+    if not image_path.exists():
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+    
+    mime_type, _ = mimetypes.guess_type(str(image_path))
+    if mime_type is None:
+        mime_type = "image/png"
+    
+    return image_path, mime_type
+
+
+def _encode_base64(image_path: Path, prefix: bytes = b"") -> bytearray:
+    """Base64-encode a file after `prefix`, in aligned chunks (never the whole raw file)."""
+    encoded = bytearray(prefix)
+    with image_path.open("rb") as f:
+        while chunk := f.read(_B64_READ_CHUNK):
+            encoded += base64.b64encode(chunk)
+    return encoded
+
 
 def image_to_base64(image_path: Path) -> tuple[str, str]:
     """
@@ -21,28 +46,23 @@ def image_to_base64(image_path: Path) -> tuple[str, str]:
     Returns:
         Tuple of (mime_type, base64_string)
     """
-    image_path = image_path.expanduser().resolve()
-    if not image_path.exists():
-        raise FileNotFoundError(f"Image file not found: {image_path}")
-    
-    mime_type, _ = mimetypes.guess_type(str(image_path))
-    if mime_type is None:
-        mime_type = "image/png"
-    
-    encoded = base64.b64encode(image_path.read_bytes()).decode("utf-8")
-    
-    return mime_type, encoded
+    image_path, mime_type = _resolve_image(image_path)
+    return mime_type, _encode_base64(image_path).decode("ascii")
 
 
 def read_image_as_data_url(image_path: Path) -> str:
     """
     Convert image to data URL format for API calls.
     
+    The data-URL prefix is written into the encode buffer first, so the payload is
+    decoded to str exactly once instead of being copied again into a concatenated string.
+    
     Args:
         image_path: Path to image file
         
     Returns:
         Data URL string (data:image/png;base64,...)
     """
-    mime_type, b64_data = image_to_base64(image_path)
-    return f"data:{mime_type};base64,{b64_data}"
\ No newline at end of file
+    image_path, mime_type = _resolve_image(image_path)
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+    return _encode_base64(image_path, prefix).decode("ascii")
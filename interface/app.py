@@ -8,14 +8,17 @@ Streamlit UI for the Offer Creation Tool. Handles:
 - Results display and download
 """
 
+import hashlib
+import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
-import numpy as np
-import pandas as pd
 import streamlit as st
 
 from components import (
+    force_availability_ints,
     render_department_selector,
     render_download_buttons,
     render_file_uploader,
@@ -27,7 +30,7 @@ from components import (
     render_success_message,
 )
 from processor import process_uploaded_file
-from styles import get_custom_css
+from styles import CUSTOM_CSS
 
 import sys
 from pathlib import Path
@@ -39,21 +42,56 @@ from config import (
     MAX_SHEET_COLS,
     MAX_SHEETS,
     EXTREME_COLS_LIMIT,
+    WRITE_IMAGES_TO_DISK,
 )
+from domain.schemas import HEADERS_BY_DEPT
+from writers.excel_writer import dataframe_columns, write_columns_to_xlsx
 
 
-def _force_availability_ints(df: pd.DataFrame) -> pd.DataFrame:
-    """Ensure availability columns display as integers (no .0 decimals)."""
-    if df is None or df.empty:
-        return df
+def _prepare_product_image(item: tuple[int, object]) -> tuple[int, Path | BytesIO]:
+    """Turn one uploaded product image into what the Excel writer reads, keeping its row index.
 
-    cols = ["Availability/Cartons", "Availability/Pieces", "Availability/Pallets"]
-    for c in cols:
-        if c in df.columns:
-            s = pd.to_numeric(df[c], errors="coerce")
-            s = np.ceil(s)
-            df[c] = s.astype("Int64")
-    return df
+    Images are passed in memory; WRITE_IMAGES_TO_DISK keeps the temp-file round-trip for debugging.
+    """
+    idx, img_file = item
+
+    if WRITE_IMAGES_TO_DISK:
+        temp_dir = Path(tempfile.gettempdir()) / "offer_images"
+        temp_dir.mkdir(exist_ok=True)
+        # Content-addressed name: re-clicking download with the same image skips the write.
+        digest = hashlib.blake2b(img_file.getbuffer(), digest_size=8).hexdigest()
+        img_path = temp_dir / f"product_{idx}_{digest}{Path(img_file.name).suffix}"
+        if not img_path.exists():
+            with open(img_path, "wb") as f:
+                f.write(img_file.getbuffer())
+        return idx, img_path
+
+    # getvalue() hands back the upload's own bytes and BytesIO shares them until written to,
+    # so no copy of the image is made (BytesIO(getbuffer()) would copy it).
+    img_stream = BytesIO(img_file.getvalue())
+    img_stream.name = img_file.name
+    return idx, img_stream
+
+
+def _release_session_resources() -> None:
+    """Free what a session pins beyond its keys: upload buffers and its temp Excel outputs.
+
+    Streamlit keeps session state until the session ends, so buffers and files are released
+    explicitly on reset instead of waiting for garbage collection.
+    """
+    for img_file in (st.session_state.get("product_images") or {}).values():
+        img_file.close()
+
+    output_path = st.session_state.get("output_path")
+    if isinstance(output_path, Path):
+        temp_dir = Path(tempfile.gettempdir())
+        stem = output_path.name.replace(".xlsx", "")
+        for path in (
+            output_path,
+            temp_dir / f"with_images_{output_path.name}",
+            temp_dir / f"{stem}_data_only.xlsx",
+        ):
+            path.unlink(missing_ok=True)
 
 
 def _get_file_type(uploaded_file) -> str:
@@ -78,9 +116,12 @@ def _validate_excel_file(uploaded_file) -> tuple[bool, str, dict]:
     """
     Validate Excel file size and structure.
     
+    The workbook is opened straight from the in-memory upload; the processor writes the
+    single on-disk copy the pipeline needs.
+    
     Returns:
         (is_valid, error_message, sheet_info_dict)
-        sheet_info_dict = {sheet_name: {"rows": int, "cols": int}}
+        sheet_info_dict = {first_sheet_name: {"rows": int, "cols": int}}
     """
     import openpyxl
     
@@ -89,34 +130,29 @@ def _validate_excel_file(uploaded_file) -> tuple[bool, str, dict]:
         return False, f"❌ File size ({file_size_mb:.1f} MB) exceeds limit ({MAX_FILE_SIZE_MB} MB). Please reduce file size.", {}
     
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp:
-            tmp.write(uploaded_file.getbuffer())
-            tmp_path = tmp.name
-        
-        wb = openpyxl.load_workbook(tmp_path, read_only=True, data_only=True)
+        # BytesIO(getvalue()) shares the upload's bytes; BytesIO(getbuffer()) would copy them.
+        wb = openpyxl.load_workbook(BytesIO(uploaded_file.getvalue()), read_only=True, data_only=True)
         
         sheet_info = {}
         total_sheets = len(wb.sheetnames)
         
         if total_sheets > MAX_SHEETS:
             wb.close()
-            Path(tmp_path).unlink(missing_ok=True)
             return False, f"❌ File has {total_sheets} sheets. Maximum {MAX_SHEETS} sheets allowed.", {}
         
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            rows = ws.max_row
-            cols = ws.max_column
-            
-            sheet_info[sheet_name] = {"rows": rows, "cols": cols}
+        # Only the first sheet is processed, so only its dimensions are read.
+        ws = wb.worksheets[0]
+        sheet_info[ws.title] = {"rows": ws.max_row, "cols": ws.max_column}
         
         wb.close()
-        Path(tmp_path).unlink(missing_ok=True)
         
         return True, "", sheet_info
         
     except Exception as e:
         return False, f"❌ Error reading Excel file: {str(e)}", {}
+    finally:
+        # Leave the upload stream at the start for the processor.
+        uploaded_file.seek(0)
 
 
 def _check_sheet_limits(sheet_info: dict, selected_sheet: str) -> tuple[bool, str]:
@@ -155,7 +191,7 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-st.markdown(get_custom_css(), unsafe_allow_html=True)
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ============================================================================
 # SESSION STATE INITIALIZATION
@@ -198,6 +234,9 @@ dept_type, double_stackable, extract_price = render_department_selector()
 st.session_state.double_stackable = double_stackable
 st.session_state.extract_price = extract_price
 st.session_state.dept_type = dept_type
+# Resolved once per department choice; both download branches read these.
+st.session_state.headers = HEADERS_BY_DEPT.get(dept_type)
+st.session_state.sheet_name = dept_type.upper() if dept_type else None
 
 if dept_type:
     uploaded_file = render_file_uploader()
@@ -296,7 +335,7 @@ if dept_type:
                     )
 
                     if success:
-                        df = _force_availability_ints(df)
+                        df = force_availability_ints(df)
 
                         st.session_state.processed = True
                         st.session_state.output_path = output_path
@@ -313,19 +352,9 @@ if dept_type:
 if st.session_state.processed and st.session_state.df is not None:
     render_success_message()
 
-    edited_df = render_selectable_table(st.session_state.df)
-
-    if edited_df is not None and len(edited_df) > 0 and "Include" in edited_df.columns:
-        selected_df = edited_df[edited_df["Include"] == True].copy()
-        selected_df.drop(columns=["Include"], inplace=True, errors="ignore")
-        selected_df.reset_index(drop=True, inplace=True)
-    else:
-        selected_df = edited_df.copy() if edited_df is not None else None
-        if selected_df is not None:
-            selected_df.reset_index(drop=True, inplace=True)
-
-    if selected_df is not None:
-        selected_df = _force_availability_ints(selected_df)
+    # render_selectable_table already returns a fresh, re-indexed frame of the ticked rows
+    # with integer availability columns, so no extra copy/coercion is needed on reruns.
+    selected_df = render_selectable_table(st.session_state.df)
 
     st.session_state.selected_df = selected_df
 
@@ -339,89 +368,67 @@ if st.session_state.processed and st.session_state.df is not None:
         base_filename=st.session_state.output_path.name,
     )
 
-    if action == "no_images" and selected_df is not None and len(selected_df) > 0:
-        with st.spinner("📄 Generating Excel (no images)..."):
-            from domain.schemas import FOOD_HEADERS, HPC_HEADERS
-            from writers.excel_writer import write_rows_to_xlsx
-
-            headers = FOOD_HEADERS if st.session_state.dept_type == "food" else HPC_HEADERS
-            rows = selected_df.to_dict(orient="records")
-
-            base = st.session_state.output_path.name if st.session_state.output_path else "offer.xlsx"
-            output_no_images = Path(tempfile.gettempdir()) / f"no_images_{base}"
-
-            write_rows_to_xlsx(
-                output_path=output_no_images,
-                sheet_name=st.session_state.dept_type.upper(),
-                headers=headers,
-                rows=rows,
-                product_images=None,
-            )
-
-            st.success("✅ Excel (no images) generated!")
-
-            with open(output_no_images, "rb") as f:
-                st.download_button(
-                    label="📥 Download Excel (No Images)",
-                    data=f,
-                    file_name=output_no_images.name,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    type="secondary",
-                    width="stretch",
-                    key="download_no_images",
-                )
-
     if action == "with_images" and images_to_use and selected_df is not None and len(selected_df) > 0:
-        with st.spinner("🎨 Generating Excel with images..."):
-            from domain.schemas import FOOD_HEADERS, HPC_HEADERS
-            from writers.excel_writer import write_rows_to_xlsx
-
-            headers = FOOD_HEADERS if st.session_state.dept_type == "food" else HPC_HEADERS
-
-            temp_dir = Path(tempfile.gettempdir()) / "offer_images"
-            temp_dir.mkdir(exist_ok=True)
+        base = st.session_state.output_path.name if st.session_state.output_path else "offer.xlsx"
+        output_with_images = Path(tempfile.gettempdir()) / f"with_images_{base}"
+
+        # Clicking again with the same selection and the same images reuses the workbook bytes
+        # instead of re-embedding every image.
+        signature = (
+            st.session_state.dept_type,
+            base,
+            st.session_state.selection_signature,
+            tuple(
+                (idx, hashlib.blake2b(img.getbuffer(), digest_size=16).digest())
+                for idx, img in sorted(images_to_use.items())
+            ),
+        )
+        cached = st.session_state.get("excel_with_images")
+        if cached is not None and cached[0] == signature:
+            excel_bytes = cached[1]
+        else:
+            with st.spinner("🎨 Generating Excel with images..."):
+
+                image_paths: list[Path | BytesIO | None] = [None] * len(selected_df)
+                pending = [(idx, img) for idx, img in images_to_use.items() if idx < len(selected_df)]
+                if WRITE_IMAGES_TO_DISK and pending:
+                    # Debug disk writes are real I/O: overlap them on an order-preserving pool.
+                    max_workers = min(len(pending), 16, (os.cpu_count() or 1) * 2)
+                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        prepared = list(executor.map(_prepare_product_image, pending))
+                else:
+                    # In memory this is only a BytesIO wrap per image; a pool would cost more.
+                    prepared = [_prepare_product_image(item) for item in pending]
+                for idx, image in prepared:
+                    image_paths[idx] = image
+
+                columns = dataframe_columns(selected_df, st.session_state.headers)
+
+                write_columns_to_xlsx(
+                    output_path=output_with_images,
+                    sheet_name=st.session_state.sheet_name,
+                    headers=st.session_state.headers,
+                    columns=columns,
+                    product_images=image_paths,
+                )
 
-            image_paths: list[Path | None] = []
-            for idx in range(len(selected_df)):
-                if idx in images_to_use:
-                    img_file = images_to_use[idx]
-                    img_ext = Path(img_file.name).suffix
-                    img_path = temp_dir / f"product_{idx}{img_ext}"
+                excel_bytes = output_with_images.read_bytes()
+            st.session_state.excel_with_images = (signature, excel_bytes)
 
-                    with open(img_path, "wb") as f:
-                        f.write(img_file.getbuffer())
+        st.success("✅ Excel with images generated!")
 
-                    image_paths.append(img_path)
-                else:
-                    image_paths.append(None)
-
-            rows = selected_df.to_dict(orient="records")
-
-            base = st.session_state.output_path.name if st.session_state.output_path else "offer.xlsx"
-            output_with_images = Path(tempfile.gettempdir()) / f"with_images_{base}"
-
-            write_rows_to_xlsx(
-                output_path=output_with_images,
-                sheet_name=st.session_state.dept_type.upper(),
-                headers=headers,
-                rows=rows,
-                product_images=image_paths,
-            )
-
-            st.success("✅ Excel with images generated!")
-
-            with open(output_with_images, "rb") as f:
-                st.download_button(
-                    label="📥 Download Excel with Images",
-                    data=f,
-                    file_name=output_with_images.name,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    type="primary",
-                    width="stretch",
-                    key="final_download",
-                )
+        st.download_button(
+            label="📥 Download Excel with Images",
+            data=excel_bytes,
+            file_name=output_with_images.name,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            type="primary",
+            width="stretch",
+            key="final_download",
+        )
 
     if render_reset_button():
+        _release_session_resources()
         for key in list(st.session_state.keys()):
             del st.session_state[key]
         st.rerun()
\ No newline at end of file
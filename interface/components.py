@@ -4,6 +4,7 @@ Reusable UI elements
 """
 
 import base64
+import hashlib
 import tempfile
 import urllib.parse
 from io import BytesIO
@@ -14,9 +15,13 @@ import pandas as pd
 import streamlit as st
 
 
+@st.cache_data(show_spinner=False)
 def render_logo_html() -> str:
     """
     Returns HTML string to render logo as a square.
+
+    Cached: the header renders on every rerun, and the logo file never changes while the
+    app runs, so it is read and base64-encoded once.
     """
     logo_dir = Path(__file__).parent / "company_logo"
     if not logo_dir.exists():
@@ -141,22 +146,63 @@ def render_success_message():
     )
 
 
-def _force_availability_int_display(df: pd.DataFrame) -> pd.DataFrame:
+_INT32_MAX = np.iinfo(np.int32).max
+# Ceiled values at or beyond this cannot be stored as int64 and are shown as missing.
+_INT64_LIMIT = float(2 ** 63)
+
+
+def _availability_int_dtype(values: np.ndarray) -> str:
+    """Nullable int dtype for ceiled availability values: Int32 (half the memory of Int64)
+    unless a finite value would not fit."""
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() > _INT32_MAX:
+        return "Int64"
+    return "Int32"
+
+
+def _availability_float_block(df: pd.DataFrame, cols: list) -> np.ndarray:
+    """Availability columns as one (rows x cols) float64 array, NaN where not numeric.
+
+    Numeric columns are read directly; only text/object columns go through to_numeric.
     """
-    Streamlit preview fix:
-    - Ensure availability columns are integers (nullable Int64)
-    - Use CEIL for any floats
-    - Keep missing values as <NA>
+    block = np.empty((len(df), len(cols)), dtype="float64")
+    for i, c in enumerate(cols):
+        col = df[c]
+        if not pd.api.types.is_numeric_dtype(col.dtype):
+            col = pd.to_numeric(col, errors="coerce")
+        block[:, i] = col.to_numpy(dtype="float64", na_value=np.nan)
+    return block
+
+
+def force_availability_ints(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ensure availability columns are integers (no .0 decimals), in place:
+    - nullable Int32, Int64 if needed
+    - CEIL for any floats
+    - missing, non-numeric and non-finite values (e.g. "inf") become <NA>
     """
     if df is None or df.empty:
         return df
 
-    cols = ["Availability/Cartons", "Availability/Pieces", "Availability/Pallets"]
-    for c in cols:
-        if c in df.columns:
-            s = pd.to_numeric(df[c], errors="coerce")
-            s = np.ceil(s)
-            df[c] = s.astype("Int64")
+    cols = [c for c in ("Availability/Cartons", "Availability/Pieces", "Availability/Pallets") if c in df.columns]
+    if not cols:
+        return df
+
+    # Already nullable/plain ints (e.g. a frame coerced earlier): nothing to ceil.
+    if all(pd.api.types.is_integer_dtype(df[c].dtype) for c in cols):
+        return df
+
+    # One ceil over a single float block; columns are rebuilt from (values, mask) directly.
+    block = _availability_float_block(df, cols)
+    np.ceil(block, out=block)
+    with np.errstate(invalid="ignore"):
+        mask = ~(np.abs(block) < _INT64_LIMIT)  # also true for NaN and +/-inf
+    block[mask] = 0
+
+    values = block.T.astype(_availability_int_dtype(block).lower())
+    mask = np.ascontiguousarray(mask.T)
+    for i, c in enumerate(cols):
+        df[c] = pd.arrays.IntegerArray(values[i], mask[i])
     return df
 
 
@@ -180,11 +226,16 @@ def render_selectable_table(df: pd.DataFrame) -> pd.DataFrame:
         st.session_state.row_selected = [False] * n
 
     # IMPORTANT: do NOT format availability as strings (that is what caused floats/decimals)
-    # Instead: force proper Int64 dtype for clean display.
-    view_df = _force_availability_int_display(df.copy())
+    # Instead: force a proper nullable int dtype for clean display.
+    view_df = force_availability_ints(df.copy())
 
     view_df.insert(0, "_selected", st.session_state.row_selected)
 
+    # Key the editor on the table's content: reruns over the same table keep one stable
+    # widget, and a newly processed table gets a fresh editor instead of inheriting edits.
+    table_digest = _frame_signature(df)[2]
+    editor_key = "products_editor_" + table_digest.hex()
+
     edited = st.data_editor(
         view_df,
         width="stretch",  # use_container_width -> width='stretch'
@@ -198,16 +249,19 @@ def render_selectable_table(df: pd.DataFrame) -> pd.DataFrame:
         },
         disabled=[c for c in view_df.columns if c != "_selected"],
         height=520,
-        key="products_editor",
+        key=editor_key,
     )
 
     st.session_state.row_selected = edited["_selected"].tolist()
 
-    selected_mask = pd.Series(st.session_state.row_selected, index=df.index)
-    selected_df = df[selected_mask].copy().reset_index(drop=True)
+    # Select from the already-coerced view (filtering keeps the int dtypes), so the
+    # availability columns are not coerced a second time. Positional take on a plain bool
+    # array: no aligned boolean Series, and drop() already returns a new frame.
+    selected_mask = np.asarray(st.session_state.row_selected, dtype=bool)
+    selected_df = view_df.iloc[selected_mask].drop(columns="_selected").reset_index(drop=True)
 
-    # Keep selected_df also clean for subsequent steps
-    selected_df = _force_availability_int_display(selected_df)
+    # Identifies this selection without hashing selected_df again (see render_download_buttons).
+    st.session_state.selection_signature = (table_digest, selected_mask.tobytes())
 
     st.caption(f"Selected: {len(selected_df)} / {len(df)} products")
     return selected_df
@@ -266,6 +320,13 @@ def render_product_image_uploader(selected_df):
     return uploaded_images
 
 
+def _frame_signature(df: pd.DataFrame) -> tuple:
+    """Content fingerprint of a frame (columns + row hashes) for session-state caches."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+    return tuple(df.columns), len(df), digest
+
+
 def render_download_buttons(selected_df, product_images, dept_type, base_filename="offer_output.xlsx"):
     st.markdown("---")
     st.markdown("### 💾 Download Result")
@@ -274,8 +335,7 @@ def render_download_buttons(selected_df, product_images, dept_type, base_filenam
         st.warning("No products selected. Select at least 1 product to enable download.")
         return None, None
 
-    # Ensure clean ints before exporting
-    selected_df = _force_availability_int_display(selected_df.copy())
+    # selected_df comes from render_selectable_table, whose availability columns are already ints.
 
     col1, col2 = st.columns(2)
 
@@ -297,38 +357,45 @@ def render_download_buttons(selected_df, product_images, dept_type, base_filenam
         st.markdown("**📊 Data Only**")
 
         filename = base_filename.replace(".xlsx", "") + "_data_only.xlsx"
-        out_path = Path(tempfile.gettempdir()) / filename
-
-        from domain.schemas import FOOD_HEADERS, HPC_HEADERS
-        from writers.excel_writer import write_rows_to_xlsx
 
-        if dept_type == "food":
-            headers = FOOD_HEADERS
-            sheet_name = "FOOD"
+        # Reruns with the same selection reuse the workbook bytes kept in session state
+        # instead of rewriting and re-reading the file on every widget interaction.
+        # The table hash + tick mask from render_selectable_table identify the selection;
+        # hash the frame itself only when it did not come from there.
+        selection = st.session_state.get("selection_signature") or _frame_signature(selected_df)
+        signature = (dept_type, filename, selection)
+        cached = st.session_state.get("excel_data_only")
+        if cached is not None and cached[0] == signature:
+            excel_bytes = cached[1]
         else:
-            headers = HPC_HEADERS
-            sheet_name = "HPC"
+            from domain.schemas import HEADERS_BY_DEPT
+            from writers.excel_writer import dataframe_columns, write_columns_to_xlsx
 
-        rows = selected_df.to_dict(orient="records")
+            headers = HEADERS_BY_DEPT[dept_type]
+            sheet_name = dept_type.upper()
 
-        write_rows_to_xlsx(
-            output_path=out_path,
-            sheet_name=sheet_name,
-            headers=headers,
-            rows=rows,
-            product_images=None,
-        )
+            out_path = Path(tempfile.gettempdir()) / filename
 
-        with open(out_path, "rb") as f:
-            st.download_button(
-                label="📥 Download Excel Without Images",
-                data=f,
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                width="stretch",  # use_container_width -> width='stretch'
-                key="download_no_images_btn",
+            write_columns_to_xlsx(
+                output_path=out_path,
+                sheet_name=sheet_name,
+                headers=headers,
+                columns=dataframe_columns(selected_df, headers),
+                product_images=None,
             )
 
+            excel_bytes = out_path.read_bytes()
+            st.session_state.excel_data_only = (signature, excel_bytes)
+
+        st.download_button(
+            label="📥 Download Excel Without Images",
+            data=excel_bytes,
+            file_name=filename,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            width="stretch",  # use_container_width -> width='stretch'
+            key="download_no_images_btn",
+        )
+
     return None, None
 
 
@@ -5,6 +5,7 @@ Routes uploaded files to pipeline for processing.
 Returns standardized DataFrame.
 """
 
+import hashlib
 import streamlit as st
 from pathlib import Path
 import tempfile
@@ -14,7 +15,8 @@ import shutil
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from runners.pipeline import process_file
+# Distinct (file, options) extractions kept in the extraction cache.
+_EXTRACTION_CACHE_ENTRIES = 8
 
 
 def _normalize_text(x) -> str:
@@ -24,6 +26,29 @@ def _normalize_text(x) -> str:
     return str(x).strip().lower()
 
 
+@st.cache_data(show_spinner=False, max_entries=_EXTRACTION_CACHE_ENTRIES)
+def _cached_extraction(
+    digest: str,
+    file_name: str,
+    extract_price: bool,
+    selected_sheet: str,
+    _data: bytes,
+) -> list:
+    """
+    Canonical rows for an upload, memoized on its content digest and the extraction options.
+
+    Only the read + LLM extraction stage is cached; article numbers are allocated by
+    process_file on every run, so a cache hit never reuses numbers. `_data` is excluded
+    from the key (the digest stands in for it). Exceptions are not cached.
+    """
+    from runners.pipeline import extract_canonical_rows
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir) / file_name
+        input_path.write_bytes(_data)
+        return extract_canonical_rows(input_path, extract_price=extract_price, sheet_name=selected_sheet)
+
+
 def process_uploaded_file(
     uploaded_file,
     dept_type: str,
@@ -48,6 +73,10 @@ def process_uploaded_file(
     Returns:
         tuple: (success: bool, output_path: Path|None, df: DataFrame|None, error: str|None)
     """
+    # Deferred: the pipeline pulls in the LLM client, Excel/PDF readers and writers, which
+    # only the first processing run needs, not every UI worker start.
+    from runners.pipeline import process_file
+
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_dir = Path(temp_dir)
 
@@ -68,6 +97,15 @@ def process_uploaded_file(
             status_text.text("🤖 AI is extracting data...")
             progress_bar.progress(40)
 
+            data = uploaded_file.getvalue()
+            canonical_rows = _cached_extraction(
+                hashlib.blake2b(data, digest_size=16).hexdigest(),
+                uploaded_file.name,
+                extract_price,
+                selected_sheet,
+                _data=data,
+            )
+
             output_path, df = process_file(
                 input_path=input_path,
                 category=dept_type,
@@ -76,6 +114,7 @@ def process_uploaded_file(
                 extract_price=extract_price,
                 product_images=product_images,
                 sheet_name=selected_sheet,
+                canonical_rows=canonical_rows,
             )
 
             progress_bar.progress(80)
@@ -118,30 +157,26 @@ def process_uploaded_file(
 
                 df = df_filtered
 
-                from writers.excel_writer import write_rows_to_xlsx
-                from domain.schemas import FOOD_HEADERS, HPC_HEADERS
+                from writers.excel_writer import dataframe_columns, write_columns_to_xlsx
+                from domain.schemas import HEADERS_BY_DEPT
 
-                if dept_type == "food":
-                    headers = FOOD_HEADERS
-                    sheet_name = "FOOD"
-                else:
-                    headers = HPC_HEADERS
-                    sheet_name = "HPC"
+                headers = HEADERS_BY_DEPT[dept_type]
+                sheet_name = dept_type.upper()
                 
                 df_for_export = df.copy()
                 for col in df_for_export.columns:
                     if pd.api.types.is_datetime64_any_dtype(df_for_export[col]):
                         df_for_export[col] = df_for_export[col].astype(str).replace('NaT', '').replace('nan', '')
                 
-                rows = df_for_export.to_dict("records")
+                columns = dataframe_columns(df_for_export, headers)
 
                 final_output = Path(tempfile.gettempdir()) / f"selected_{output_path.name}"
 
-                write_rows_to_xlsx(
+                write_columns_to_xlsx(
                     output_path=final_output,
                     sheet_name=sheet_name,
                     headers=headers,
-                    rows=rows,
+                    columns=columns,
                     product_images=product_images,
                 )
             else:
@@ -3,8 +3,9 @@ Styles for Offer Creation Tool
 Clean light theme - ACG branding
 """
 
-def get_custom_css():
-    return """
+# Built once per process: Streamlit re-executes app.py on every interaction, but imported
+# modules (and this constant) are reused across reruns.
+CUSTOM_CSS = """
 <style>
 /* Hide Streamlit branding */
 #MainMenu {visibility: hidden;}
@@ -198,4 +199,4 @@ hr {
     border-top: 1px solid var(--border);
 }
 </style>
-"""
\ No newline at end of file
+"""
@@ -120,6 +120,37 @@ def extract_missing_content(row: CanonicalRow) -> CanonicalRow:
     return row
 
 
+def extract_canonical_rows(
+    input_path: Path,
+    extract_price: bool = False,
+    sheet_name: Optional[str] = None,
+) -> List[CanonicalRow]:
+    """Read + extract a file into canonical rows (pipeline Steps 1 & 2).
+
+    Depends only on the file and these options, never on allocation state, so callers
+    may cache the result and hand it back to process_file via `canonical_rows`.
+    """
+    suffix = input_path.suffix.lower()
+
+    if suffix in [".xlsx", ".xls"]:
+        # NEW: Pass sheet_name to Excel extraction
+        canonical_rows = excel_to_canonical(
+            input_path, 
+            extract_price=extract_price,
+            sheet_name=sheet_name  # NEW parameter
+        )
+        if sheet_name:
+            print(f"ℹ️  Processing sheet: '{sheet_name}'")
+    elif suffix == ".pdf":
+        canonical_rows = pdf_to_canonical(input_path, extract_price=extract_price)
+    elif suffix in [".png", ".jpg", ".jpeg"]:
+        canonical_rows = image_to_canonical(input_path, extract_price=extract_price)
+    else:
+        raise ValueError(f"Unsupported file type: {suffix}")
+
+    return canonical_rows
+
+
 def process_file(
     input_path: Path,
     category: Literal["food", "hpc"],
@@ -128,6 +159,7 @@ def process_file(
     extract_price: bool = False,
     product_images: Optional[List[Optional[Path]]] = None,
     sheet_name: Optional[str] = None,  # NEW: Sheet name to process
+    canonical_rows: Optional[List[CanonicalRow]] = None,
 ) -> tuple[Path, pd.DataFrame]:
     """Process a single offer file through complete pipeline.
 
@@ -149,6 +181,8 @@ def process_file(
         extract_price: If True, extract price from supplier offer
         product_images: Optional list of image paths (one per product, None for missing)
         sheet_name: Optional sheet name to process (Excel only, None = first sheet)
+        canonical_rows: Rows already extracted from this file by extract_canonical_rows
+            (e.g. cached); skips Steps 1 & 2. Article numbers are still allocated.
 
     Returns:
         tuple: (output_path, dataframe)
@@ -156,23 +190,8 @@ def process_file(
     print(f"\n📄 Processing: {input_path.name}")
 
     # Step 1 & 2: Read + Extract → Canonical
-    suffix = input_path.suffix.lower()
-
-    if suffix in [".xlsx", ".xls"]:
-        # NEW: Pass sheet_name to Excel extraction
-        canonical_rows = excel_to_canonical(
-            input_path, 
-            extract_price=extract_price,
-            sheet_name=sheet_name  # NEW parameter
-        )
-        if sheet_name:
-            print(f"ℹ️  Processing sheet: '{sheet_name}'")
-    elif suffix == ".pdf":
-        canonical_rows = pdf_to_canonical(input_path, extract_price=extract_price)
-    elif suffix in [".png", ".jpg", ".jpeg"]:
-        canonical_rows = image_to_canonical(input_path, extract_price=extract_price)
-    else:
-        raise ValueError(f"Unsupported file type: {suffix}")
+    if canonical_rows is None:
+        canonical_rows = extract_canonical_rows(input_path, extract_price, sheet_name)
 
     print(f"✓ Extracted {len(canonical_rows)} products")
 
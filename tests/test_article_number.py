@@ -0,0 +1,77 @@
+"""Regression tests for the reservation-window article-number allocator."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from fields.article_number import (
+    ArticleNumberAllocator,
+    ArticleNumberConfig,
+    ArticleNumberError,
+    format_article_number,
+)
+
+
+class AllocatorWindowTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state_path = Path(self._tmp.name) / "article_number.json"
+        self.cfg = ArticleNumberConfig()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _allocator(self, reserve=10):
+        return ArticleNumberAllocator(self.cfg, state_path=self.state_path, reserve=reserve)
+
+    def _persisted(self):
+        return json.loads(self.state_path.read_text())["next"]
+
+    def test_numbers_are_sequential_across_windows(self):
+        with self._allocator(reserve=3) as allocator:
+            numbers = allocator.allocate(2) + allocator.allocate(4) + [allocator.allocate(1)[0]]
+        expected = [format_article_number(n) for n in range(1000, 1007)]
+        self.assertEqual(numbers, expected)
+        self.assertEqual(self._persisted(), 1007)
+
+    def test_state_points_past_the_reserved_window(self):
+        allocator = self._allocator(reserve=10)
+        allocator.allocate(5)
+        self.assertEqual(self._persisted(), 1015)
+
+    def test_flush_releases_the_unused_window(self):
+        allocator = self._allocator(reserve=10)
+        allocator.allocate(5)
+        allocator.flush()
+        self.assertEqual(self._persisted(), 1005)
+        self.assertEqual(allocator.peek_next(), format_article_number(1005))
+
+    def test_flush_does_not_rewind_another_writers_counter(self):
+        first = self._allocator(reserve=10)
+        second = self._allocator(reserve=10)
+        a = first.allocate(5)
+        b = second.allocate(5)
+        first.flush()
+        second.flush()
+        self.assertFalse(set(a) & set(b))
+        self.assertEqual(self._persisted(), 1020)
+
+        third = self._allocator()
+        self.assertEqual(third.allocate(1), [format_article_number(1020)])
+
+    def test_block_formatting_matches_per_number_formatting(self):
+        allocator = self._allocator(reserve=0)
+        allocator.allocate(7)  # unaligned start for the blocks of ten
+        numbers = allocator.allocate(2503)
+        self.assertEqual(numbers, [format_article_number(n) for n in range(1007, 3510)])
+
+    def test_invalid_count_is_rejected(self):
+        allocator = self._allocator()
+        for count in (0, -1, 1.5):
+            with self.subTest(count=count), self.assertRaises(ArticleNumberError):
+                allocator.allocate(count)
+
+
+if __name__ == "__main__":
+    unittest.main()
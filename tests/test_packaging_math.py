@@ -0,0 +1,52 @@
+"""Regression tests: the bulk packaging math must match the per-row API value for value."""
+
+import copy
+import random
+import unittest
+
+import pandas as pd
+
+from fields.packaging_math import apply_packaging_math, apply_packaging_math_bulk
+
+_KEYS = (
+    "piece_per_case", "case_per_pallet", "pieces_per_pallet",
+    "availability_pieces", "availability_cartons", "availability_pallets",
+)
+# Missing values, zeros/negatives, ints, floats, numeric strings (incl. decimal commas),
+# junk strings and bools: everything the per-row parser distinguishes.
+_VALUES = (None, None, 0, -3, 1, 2, 3, 7, 12, 24.0, 2.5, "6", "1,5", " 7 ", "abc", "", True, 100, 330)
+
+
+class PackagingMathTests(unittest.TestCase):
+    def test_triad_and_availability_are_completed(self):
+        row = apply_packaging_math({"piece_per_case": 12, "case_per_pallet": 50, "availability_pieces": 1300})
+        self.assertEqual(row["pieces_per_pallet"], 600)
+        self.assertEqual(row["availability_cartons"], 109)
+        self.assertEqual(row["availability_pallets"], 3)
+
+    def test_bulk_matches_per_row(self):
+        rng = random.Random(7)
+        rows = [
+            {k: rng.choice(_VALUES) for k in _KEYS if rng.random() < 0.9}
+            for _ in range(5000)
+        ]
+        expected = [apply_packaging_math(copy.deepcopy(r)) for r in rows]
+
+        frame = pd.DataFrame([dict.fromkeys(_KEYS) | r for r in rows], dtype=object)
+        result = apply_packaging_math_bulk(frame)
+
+        for i, (row, want) in enumerate(zip(rows, expected)):
+            for k in _KEYS:
+                got = result.at[i, k]
+                with self.subTest(row=row, field=k):
+                    self.assertEqual(type(got), type(want.get(k)))
+                    self.assertEqual(got, want.get(k))
+
+    def test_bulk_leaves_the_input_frame_untouched(self):
+        frame = pd.DataFrame([{"piece_per_case": 10, "case_per_pallet": 5}], dtype=object)
+        apply_packaging_math_bulk(frame)
+        self.assertEqual(list(frame.columns), ["piece_per_case", "case_per_pallet"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Regression tests for the rule-based (no-LLM) Excel extraction path."""
+
+import unittest
+from datetime import datetime
+
+from extraction.rule_based import extract_row, map_header, split_rows
+
+
+class DescriptionFastPathTests(unittest.TestCase):
+    def _row(self, description):
+        return {"EAN": "8712345678901", "Product Description": description, "Stock": 120}
+
+    def test_english_description_is_mapped_locally(self):
+        product = extract_row(self._row("Dark Chocolate Biscuits 100G"))
+        self.assertEqual(product["product_description"], "DARK CHOCOLATE BISCUITS 100G")
+        self.assertEqual(product["ean"], "8712345678901")
+        self.assertEqual(product["availability_pieces"], 120)
+
+    def test_non_english_descriptions_go_to_the_llm(self):
+        for description in (
+            "BISCUITS AU CHOCOLAT NOIR",
+            "GALLETAS DE CHOCOLATE",
+            "SCHOKOLADE KEKSE",
+            "GEL DOUCHE 250ML",
+            "GUIGOZ OPTIPRO 3EME AGE DES 12 MOIS",
+        ):
+            with self.subTest(description=description):
+                self.assertIsNone(extract_row(self._row(description)))
+
+    def test_brands_and_abbreviations_go_to_the_llm(self):
+        for description in ("HARIBO GOLDBEARS", "MKA CHOCO HZLN", "Bébé lotion"):
+            with self.subTest(description=description):
+                self.assertIsNone(extract_row(self._row(description)))
+
+    def test_bbd_dates_are_kept_as_dates(self):
+        bbd = datetime(2025, 6, 30)
+        product = extract_row({"Product Description": "MILK CHOCOLATE", "BBD": bbd})
+        self.assertEqual(product["bbd"], bbd)
+
+
+class RowRoutingTests(unittest.TestCase):
+    def test_unknown_header_or_unit_text_needs_the_llm(self):
+        self.assertIsNone(extract_row({"Product Description": "MILK CHOCOLATE", "Remarks": "promo"}))
+        self.assertIsNone(extract_row({"Product Description": "MILK CHOCOLATE", "Stock": "2 pal"}))
+
+    def test_content_without_a_unit_needs_the_llm(self):
+        for content in (500, "500", "1,5"):
+            with self.subTest(content=content):
+                self.assertIsNone(extract_row({"Product Description": "MILK CHOCOLATE", "Weight": content}))
+
+        for content in ("500 GR", "1,5L", "330ml"):
+            with self.subTest(content=content):
+                product = extract_row({"Product Description": "MILK CHOCOLATE", "Weight": content})
+                self.assertEqual(product["content"], content)
+
+    def test_case_ean_is_known_but_never_used(self):
+        self.assertEqual(map_header("EAN case"), (True, None))
+        self.assertEqual(map_header("EAN unit"), (True, "ean"))
+
+    def test_split_rows_keeps_sheet_indexes(self):
+        rows = [
+            {"Product Description": "MILK CHOCOLATE", "Stock": 10},
+            {"Product Description": "HARIBO GOLDBEARS", "Stock": 20},
+            {"Product Description": "STRAWBERRY JAM", "Stock": 30},
+        ]
+        local, pending = split_rows(rows)
+        self.assertEqual(sorted(local), [0, 2])
+        self.assertEqual(pending, [1])
+
+    def test_layer_sheets_go_entirely_to_the_llm(self):
+        rows = [{"Product Description": "MILK CHOCOLATE", "Layers": 5}]
+        self.assertEqual(split_rows(rows), ({}, [0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 """Excel writers."""
 
-from .excel_writer import write_rows_to_xlsx
+from .excel_writer import dataframe_columns, write_columns_to_xlsx, write_rows_to_xlsx
 
-__all__ = ["write_rows_to_xlsx"]
\ No newline at end of file
+__all__ = ["dataframe_columns", "write_columns_to_xlsx", "write_rows_to_xlsx"]
\ No newline at end of file
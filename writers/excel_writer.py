@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import math
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterable, List, Mapping, Optional, Sequence, Union
 
+import pandas as pd
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
@@ -22,6 +23,26 @@ _FIXED_HEADER_LABELS = {
     "Price/Unit (Euro)": "Price / Unit\n(Euro)",
 }
 
+# Fixed widths for known columns; others are sized to their longest value (max 50)
+_COLUMN_WIDTHS = {
+    "Article Number": 13,
+    "EAN code unit": 15,
+    "Product Description": 35,
+    "Content": 10,
+    "Languages": 25,
+    "Piece per case": 11,
+    "Case per pallet": 11,
+    "Pieces per pallet": 12,
+    "BBD": 12,
+    "Availability/Cartons": 13,
+    "Availability/Pieces": 13,
+    "Availability/Pallets": 13,
+    "Price/Unit (Euro)": 12,
+}
+
+# A product image is a file path or an in-memory binary stream (e.g. BytesIO)
+ImageSource = Union[Path, BinaryIO]
+
 # Availability columns must be INTEGERS in Excel
 _AVAILABILITY_COLUMNS = {
     "Availability/Cartons",
@@ -58,15 +79,85 @@ def _ceil_int(v: Any) -> Optional[int]:
     return int(math.ceil(x))
 
 
+def _column_values(series: pd.Series) -> List[Any]:
+    """Python values of one column; pd.NA (nullable dtypes such as Int64) becomes None."""
+    if getattr(series.dtype, "na_value", None) is pd.NA:
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.tolist()
+
+
+def dataframe_columns(df: pd.DataFrame, headers: List[str]) -> Dict[str, List[Any]]:
+    """Column lists of `df` for `write_columns_to_xlsx`, keyed by header.
+
+    Each column is converted to Python objects once via `Series.tolist()` (same values as
+    `df.to_dict(orient="records")`); headers missing from `df` get a column of None.
+    """
+    return {h: _column_values(df[h]) if h in df.columns else [None] * len(df) for h in headers}
+
+
+def _image_available(img: Optional[ImageSource]) -> bool:
+    """True for file-like images and for paths that exist on disk."""
+    if not img:
+        return False
+    if hasattr(img, "read"):
+        return True
+    return Path(img).exists()
+
+
 def write_rows_to_xlsx(
     output_path: Path,
     sheet_name: str,
     headers: List[str],
-    rows: List[Dict[str, Any]],
-    product_images: Optional[List[Optional[Path]]] = None,
+    rows: Iterable[Dict[str, Any]],
+    product_images: Optional[List[Optional[ImageSource]]] = None,
+) -> None:
+    """Write row dicts to Excel with professional formatting (see `_write_table`).
+
+    `rows` is consumed once, so a generator works.
+    """
+    _write_table(
+        output_path,
+        sheet_name,
+        headers,
+        ([row.get(h) for h in headers] for row in rows),
+        product_images,
+    )
+
+
+def write_columns_to_xlsx(
+    output_path: Path,
+    sheet_name: str,
+    headers: List[str],
+    columns: Mapping[str, Sequence[Any]],
+    product_images: Optional[List[Optional[ImageSource]]] = None,
+) -> None:
+    """Write column lists (header -> values) to Excel, e.g. from `dataframe_columns`.
+
+    Same output as `write_rows_to_xlsx`, without building a dict per row or looking up
+    every cell by header; headers missing from `columns` are written empty.
+    """
+    n_rows = len(next(iter(columns.values()), ()))
+    empty = [None] * n_rows
+    _write_table(
+        output_path,
+        sheet_name,
+        headers,
+        zip(*(columns.get(h, empty) for h in headers)),
+        product_images,
+    )
+
+
+def _write_table(
+    output_path: Path,
+    sheet_name: str,
+    headers: List[str],
+    value_rows: Iterable[Sequence[Any]],
+    product_images: Optional[List[Optional[ImageSource]]] = None,
 ) -> None:
     """Write rows to Excel with professional formatting.
 
+    Each item of `value_rows` holds one row's values in `headers` order.
+
     Availability calculation (ONE-WAY):
     - Availability/Pieces: Editable by user (value)
     - Availability/Cartons: Formula (=ROUNDUP(Pieces ÷ Piece per case, 0))
@@ -74,6 +165,9 @@ def write_rows_to_xlsx(
 
     When user edits Pieces → Cartons and Pallets auto-update via formulas.
     When user edits Cartons/Pallets → Formula is overwritten, no auto-update.
+
+    `value_rows` is consumed once.
+    `product_images` entries may be paths or file-like objects; streams are read in place.
     """
     print(f"📝 Writing Excel (B2 start): {output_path.name}")
 
@@ -128,14 +222,25 @@ def write_rows_to_xlsx(
     col_cartons = header_to_excel_col.get("Availability/Cartons")
     col_pallets = header_to_excel_col.get("Availability/Pallets")
 
+    # Longest value per auto-sized column, tracked while writing so rows are read only once
+    max_lengths: Dict[str, int] = {
+        header: len(str(_FIXED_HEADER_LABELS.get(header, header)).replace("\n", " "))
+        for header in headers
+        if header not in _COLUMN_WIDTHS
+    }
+
     # --- DATA ---
-    for row_idx, row_data in enumerate(rows):
+    row_count = 0
+    for row_idx, row_values in enumerate(value_rows):
+        row_count += 1
         excel_row = start_row + 1 + row_idx  # 3,4,5...
 
         # Write all cells as VALUES first
-        for col_idx, header in enumerate(headers):
+        for col_idx, (header, value) in enumerate(zip(headers, row_values)):
             excel_col = start_col + col_idx
-            value = row_data.get(header)
+
+            if value is not None and header in max_lengths:
+                max_lengths[header] = max(max_lengths[header], len(str(value)))
 
             # Force availability columns to integer (ceil) when writing values
             if header in _AVAILABILITY_COLUMNS:
@@ -201,8 +306,8 @@ def write_rows_to_xlsx(
     )
 
     # --- TOTALS ROW FOR AVAILABILITY COLUMNS ---
-    if col_cartons and col_pallets and len(rows) > 0:
-        last_data_row = start_row + len(rows)
+    if col_cartons and col_pallets and row_count > 0:
+        last_data_row = start_row + row_count
         totals_row = last_data_row + 1
 
         # Add empty cells with borders for all columns
@@ -247,36 +352,14 @@ def write_rows_to_xlsx(
         pallets_total_cell.border = Border(top=thin, bottom=thin, left=thin, right=thin)
 
     # --- OPTIMIZED COLUMN WIDTHS ---
-    COLUMN_WIDTHS = {
-        "Article Number": 13,
-        "EAN code unit": 15,
-        "Product Description": 35,
-        "Content": 10,
-        "Languages": 25,
-        "Piece per case": 11,
-        "Case per pallet": 11,
-        "Pieces per pallet": 12,
-        "BBD": 12,
-        "Availability/Cartons": 13,
-        "Availability/Pieces": 13,
-        "Availability/Pallets": 13,
-        "Price/Unit (Euro)": 12,
-    }
-
     for col_idx, header in enumerate(headers):
         excel_col = start_col + col_idx
         column_letter = get_column_letter(excel_col)
 
-        if header in COLUMN_WIDTHS:
-            width = COLUMN_WIDTHS[header]
+        if header in _COLUMN_WIDTHS:
+            width = _COLUMN_WIDTHS[header]
         else:
-            header_for_len = str(_FIXED_HEADER_LABELS.get(header, header)).replace("\n", " ")
-            max_length = len(header_for_len)
-            for row_data in rows:
-                v = row_data.get(header)
-                if v is not None:
-                    max_length = max(max_length, len(str(v)))
-            width = min(max_length + 3, 50)
+            width = min(max_lengths[header] + 3, 50)
 
         ws.column_dimensions[column_letter].width = width
 
@@ -285,11 +368,11 @@ def write_rows_to_xlsx(
 
     # --- IMAGES BELOW TABLE ---
     if product_images:
-        valid_images = [p for p in product_images if p and Path(p).exists()]
+        valid_images = [p for p in product_images if _image_available(p)]
         print(f"📸 Adding {len(valid_images)} product images...")
 
-        last_row = start_row + len(rows)
-        if rows and col_cartons and col_pieces and col_pallets:
+        last_row = start_row + row_count
+        if row_count and col_cartons and col_pieces and col_pallets:
             last_row += 1  # totals row
 
         image_start_row = last_row + 5
@@ -297,8 +380,8 @@ def write_rows_to_xlsx(
         col_spacing = 3
         row_spacing = 9
 
-        for img_idx, img_path in enumerate(product_images):
-            if not img_path or not Path(img_path).exists():
+        for img_idx, img_source in enumerate(product_images):
+            if not _image_available(img_source):
                 continue
 
             try:
@@ -310,7 +393,7 @@ def write_rows_to_xlsx(
 
                 ws.row_dimensions[excel_row].height = 115
 
-                img = XLImage(str(img_path))
+                img = XLImage(img_source if hasattr(img_source, "read") else str(img_source))
 
                 if img.width > img.height:
                     img.width = 150